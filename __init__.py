@@ -1,4 +1,7 @@
 from .models import *
 from .instrument_types import *
 from .constants import *
-from .functions import *
\ No newline at end of file
+from .functions import *
+from .station import *
+from .health import *
+from .control import *
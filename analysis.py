@@ -0,0 +1,223 @@
+"""
+Host-side spectral analysis of OSA traces with NumPy.
+
+All functions take trace data as arrays: wavelength in nm (ascending), level in dBm. Analysis of many channels is
+vectorized, no Python loop over channels or trace points.
+"""
+import numpy as np
+from .constants import LIGHT_SPEED
+
+
+__all__ = ['dbm_to_mw', 'mw_to_dbm', 'dwdm_grid', 'find_peaks', 'spectral_width', 'smsr', 'osnr',
+           'channel_power', 'analyze_wdm']
+
+REF_BANDWIDTH = 0.1  # reference noise bandwidth in nm for OSNR.
+
+
+def dbm_to_mw(level):
+    return np.power(10.0, np.asarray(level, dtype=float)/10)
+
+
+def mw_to_dbm(power):
+    with np.errstate(divide='ignore'):
+        return 10*np.log10(np.asarray(power, dtype=float))
+
+
+def _as_trace(wavelength, level):
+    wavelength = np.asarray(wavelength, dtype=float)
+    level = np.asarray(level, dtype=float)
+    if wavelength.shape != level.shape or wavelength.ndim != 1:
+        raise ValueError('wavelength and level should be 1-D arrays of the same length')
+    if wavelength.size < 3:
+        raise ValueError('trace should have at least 3 points')
+    return wavelength, level
+
+
+def dwdm_grid(start_freq, spacing, num):
+    """
+    Center wavelengths of a DWDM grid.
+
+    :Parameters:
+        - **start_freq** - float, frequency of the first channel in THz.
+        - **spacing** - float, channel spacing in GHz.
+        - **num** - int, number of channels.
+
+    :Returns: numpy.ndarray, center wavelengths in nm, in order of channel.
+    """
+    freq = start_freq + np.arange(num)*spacing/1000
+    return LIGHT_SPEED/freq
+
+
+def find_peaks(wavelength, level, threshold=20.0, min_distance=0.0):
+    """
+    Find local maxima no lower than (max level - threshold).
+
+    :Parameters:
+        - **threshold** - float, in dB below the highest peak.
+        - **min_distance** - float, in nm. Of peaks closer than it, only the higher one is kept.
+
+    :Returns: numpy.ndarray, indices of peaks in ascending wavelength.
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    mid = level[1:-1]
+    is_peak = (mid > level[:-2]) & (mid >= level[2:]) & (mid >= level.max() - threshold)
+    idx = np.flatnonzero(is_peak) + 1
+    if min_distance > 0 and idx.size > 1:
+        # keep peaks from the highest one, drop neighbours within min_distance
+        order = idx[np.argsort(level[idx])[::-1]]
+        kept = np.zeros(level.size, dtype=bool)
+        for i in order:
+            lo, hi = np.searchsorted(wavelength, [wavelength[i] - min_distance, wavelength[i] + min_distance])
+            if not kept[lo:hi].any():
+                kept[i] = True
+        idx = np.flatnonzero(kept)
+    return idx
+
+
+def spectral_width(wavelength, level, threshold=3.0, peak_index=None, max_gap=0.0):
+    """
+    Spectral width by threshold method. Starting from the peak, the spectrum is followed outward to the first points
+    below threshold on each side, and the crossings are linearly interpolated. Other channels of a WDM trace are
+    not included.
+
+    :Parameters:
+        - **threshold** - float, in dB below peak, such as 3 or 20.
+        - **peak_index** - int|None, index of peak, the highest point if None.
+        - **max_gap** - float, in nm. Dips below threshold narrower than it are bridged, so that the width of a
+          multi-mode spectrum covers all modes above threshold. Set it to at least the mode spacing for such
+          spectra, and less than the channel spacing for WDM traces.
+
+    :Returns: tuple(float width in nm, float center wavelength in nm)
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    if peak_index is None:
+        peak_index = int(np.argmax(level))
+    th_level = level[peak_index] - threshold
+    above = np.flatnonzero(level >= th_level)
+    # split points above threshold into clusters at dips wider than max_gap, take the cluster of the peak
+    breaks = np.flatnonzero((np.diff(above) > 1) & (np.diff(wavelength[above]) > max_gap))
+    starts = above[np.concatenate(([0], breaks + 1))]
+    ends = above[np.concatenate((breaks, [above.size - 1]))]
+    k = np.searchsorted(starts, peak_index, side='right') - 1
+    i0 = starts[k]
+    i1 = ends[k]
+    if i0 == 0 or i1 == level.size - 1:
+        raise ValueError('Spectrum does not fall below threshold on both sides of peak')
+    wl_left = np.interp(th_level, level[i0 - 1:i0 + 1], wavelength[i0 - 1:i0 + 1])
+    wl_right = np.interp(th_level, level[i1:i1 + 2][::-1], wavelength[i1:i1 + 2][::-1])
+    return float(wl_right - wl_left), float((wl_right + wl_left)/2)
+
+
+def smsr(wavelength, level, mask=0.0):
+    """
+    Side mode suppression ratio, the highest peak over the highest other local maximum.
+
+    :Parameters: **mask** - float, in nm. Modes within mask around the main peak are ignored.
+
+    :Returns: tuple(float smsr in dB, float wavelength of side mode in nm)
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    peaks = find_peaks(wavelength, level, threshold=np.inf)
+    main = int(np.argmax(level))
+    side = peaks[(peaks != main) & (np.abs(wavelength[peaks] - wavelength[main]) > mask)]
+    if side.size == 0:
+        raise ValueError('No side mode found')
+    i = side[np.argmax(level[side])]
+    return float(level[main] - level[i]), float(wavelength[i])
+
+
+def osnr(wavelength, level, centers, noise_offset, resolution, signal_bandwidth=0.0, ref_bandwidth=REF_BANDWIDTH):
+    """
+    OSNR of channels by IEC 61280-2-9 interpolation method. Noise is measured at center +/- noise_offset and
+    linearly interpolated to channel center in linear scale.
+
+    :Parameters:
+        - **centers** - array, channel center wavelengths in nm.
+        - **noise_offset** - float, in nm, usually half of channel spacing.
+        - **resolution** - float, resolution bandwidth of the trace in nm.
+        - **signal_bandwidth** - float, in nm. Signal power is integrated over it if > 0, otherwise the level at
+          channel center is used.
+        - **ref_bandwidth** - float, reference noise bandwidth in nm.
+
+    :Returns: dict{"signal" => ndarray in dBm, "noise" => ndarray in dBm/ref_bandwidth, "osnr" => ndarray in dB}
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    centers = np.asarray(centers, dtype=float)
+    linear = dbm_to_mw(level)
+    noise_left = np.interp(centers - noise_offset, wavelength, linear)
+    noise_right = np.interp(centers + noise_offset, wavelength, linear)
+    noise = (noise_left + noise_right)/2
+    if signal_bandwidth > 0:
+        total = channel_power(wavelength, level, centers, signal_bandwidth, resolution, as_dbm=False)
+        signal = total - noise*signal_bandwidth/resolution
+    else:
+        signal = np.interp(centers, wavelength, linear) - noise
+    noise_ref = noise*ref_bandwidth/resolution
+    with np.errstate(divide='ignore', invalid='ignore'):
+        signal_dbm = mw_to_dbm(signal)
+        noise_dbm = mw_to_dbm(noise_ref)
+    return {'signal': signal_dbm, 'noise': noise_dbm, 'osnr': signal_dbm - noise_dbm}
+
+
+def channel_power(wavelength, level, centers, bandwidth, resolution, as_dbm=True):
+    """
+    Integrated power of channels. The trace level is power in resolution bandwidth, so the integral of linear
+    level over wavelength is divided by resolution.
+
+    :Parameters:
+        - **centers** - array, channel center wavelengths in nm.
+        - **bandwidth** - float, integration bandwidth in nm around each center.
+        - **resolution** - float, resolution bandwidth of the trace in nm.
+        - **as_dbm** - bool, return in dBm if True, else in mW.
+
+    :Returns: numpy.ndarray, power of each channel.
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    centers = np.asarray(centers, dtype=float)
+    linear = dbm_to_mw(level)
+    # cumulative trapezoid integral, evaluated at window edges by interpolation
+    cumulative = np.concatenate(([0.0], np.cumsum((linear[1:] + linear[:-1])*np.diff(wavelength)/2)))
+    lo = np.interp(centers - bandwidth/2, wavelength, cumulative)
+    hi = np.interp(centers + bandwidth/2, wavelength, cumulative)
+    power = (hi - lo)/resolution
+    return mw_to_dbm(power) if as_dbm else power
+
+
+def analyze_wdm(wavelength, level, centers, resolution, spacing=None, bandwidth=None):
+    """
+    Analyze all channels of a WDM signal on a given grid.
+
+    :Parameters:
+        - **centers** - array, grid center wavelengths in nm, see dwdm_grid.
+        - **resolution** - float, resolution bandwidth of the trace in nm.
+        - **spacing** - float|None, channel spacing in nm, estimated from centers if None.
+        - **bandwidth** - float|None, integration bandwidth in nm of channel power, spacing if None.
+
+    :Returns: dict of arrays, indexed by channel: "center_wl", "peak_wl", "peak_lvl", "power", "noise", "osnr"
+    """
+    wavelength, level = _as_trace(wavelength, level)
+    centers = np.sort(np.asarray(centers, dtype=float))
+    if spacing is None:
+        if centers.size < 2:
+            raise ValueError('spacing is required for single channel')
+        spacing = float(np.median(np.diff(centers)))
+    if bandwidth is None:
+        bandwidth = spacing
+    # peak of each channel within its window: sort points by (window, level desc), take the first of each window
+    edges = np.searchsorted(wavelength, np.concatenate((centers - spacing/2, [centers[-1] + spacing/2])))
+    window = np.repeat(np.arange(centers.size), np.diff(edges))
+    seg_wl = wavelength[edges[0]:edges[-1]]
+    seg_level = level[edges[0]:edges[-1]]
+    peak_lvl = np.full(centers.size, np.nan)
+    peak_wl = np.full(centers.size, np.nan)
+    if window.size:
+        order = np.lexsort((-seg_level, window))
+        sorted_window = window[order]
+        first = np.concatenate(([True], sorted_window[1:] != sorted_window[:-1]))
+        best = order[first]
+        peak_lvl[window[best]] = seg_level[best]
+        peak_wl[window[best]] = seg_wl[best]
+    result = osnr(wavelength, level, centers, spacing/2, resolution)
+    return {'center_wl': centers, 'peak_wl': peak_wl, 'peak_lvl': peak_lvl,
+            'power': channel_power(wavelength, level, centers, bandwidth, resolution),
+            'noise': result['noise'], 'osnr': result['osnr']}
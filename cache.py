@@ -0,0 +1,104 @@
+import json
+import os
+import sys
+import threading
+
+
+__all__ = ['get_cache_dir', 'get_cache', 'set_cache', 'clear_cache']
+
+CACHE_DIR_ENV = 'PYINST_CACHE_DIR'  # environment variable to override the default cache directory.
+
+# globals
+_lock = threading.RLock()
+
+
+def get_cache_dir():
+    """
+    Get the directory where pyinst stores its local cache files.
+
+    :Returns: str, path of cache directory.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        if sys.platform.startswith('win'):
+            base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+            cache_dir = os.path.join(base, 'pyinst', 'cache')
+        else:
+            base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+            cache_dir = os.path.join(base, 'pyinst')
+    return cache_dir
+
+
+def _cache_path(name):
+    return os.path.join(get_cache_dir(), '%s.json' % name)
+
+
+def _load(name):
+    path = _cache_path(name)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    return data
+
+
+def _dump(name, data):
+    path = _cache_path(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = '%s.%d.tmp' % (path, os.getpid())
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def get_cache(name, key, default=None):
+    """
+    Get a cached entry.
+
+    :Parameters:
+        - **name** - str, name of cache file, such as 'visa_profiles'.
+        - **key** - str, key of the entry.
+        - **default** - value returned if entry is not found.
+
+    :Returns: cached value, or default.
+    """
+    with _lock:
+        return _load(name).get(key, default)
+
+
+def set_cache(name, key, value):
+    """
+    Store an entry into cache. value must be JSON serializable.
+
+    :Parameters:
+        - **name** - str, name of cache file.
+        - **key** - str, key of the entry.
+        - **value** - JSON serializable value.
+    """
+    with _lock:
+        data = _load(name)
+        data[key] = value
+        _dump(name, data)
+
+
+def clear_cache(name, key=None):
+    """
+    Remove an entry, or all entries if key is None, from cache.
+
+    :Parameters:
+        - **name** - str, name of cache file.
+        - **key** - str|None, key of the entry to remove.
+    """
+    with _lock:
+        if key is None:
+            try:
+                os.remove(_cache_path(name))
+            except FileNotFoundError:
+                pass
+            return
+        data = _load(name)
+        if data.pop(key, None) is not None:
+            _dump(name, data)
@@ -0,0 +1,285 @@
+import threading
+import time
+import numpy as np
+from .cache import get_cache, set_cache
+
+
+__all__ = ['lock_wavelength', 'lock_power', 'PowerHold']
+
+OFFSET_CACHE = 'wavelength_offsets'  # name of the local cache file of learned wavelength offset curves.
+MAX_OFFSET_POINTS = 200  # max number of points of each learned offset curve.
+
+
+def _unit_key(inst):
+    get_key = getattr(inst, '_get_profile_key', None)
+    if get_key is not None:
+        return get_key()
+    return '%s|%s' % (inst.__class__.__name__, inst.resource_name)
+
+
+def _learned_offset(key, target):
+    points = get_cache(OFFSET_CACHE, key)
+    if not points:
+        return 0.0
+    points = np.array(points, dtype=float)
+    return float(np.interp(target, points[:, 0], points[:, 1]))
+
+
+def _learn_offset(key, target, offset, resolution=0.01):
+    points = [p for p in get_cache(OFFSET_CACHE, key, []) if abs(p[0] - target) > resolution]
+    points.append([target, offset])
+    points.sort()
+    if len(points) > MAX_OFFSET_POINTS:
+        points = points[::2]
+    set_cache(OFFSET_CACHE, key, points)
+
+
+def _settle(inst, settle):
+    wait_settled = getattr(inst, 'wait_settled', None)
+    if wait_settled is not None:
+        try:
+            wait_settled()
+        except NotImplementedError:
+            pass
+    if settle:
+        time.sleep(settle)
+
+
+def lock_wavelength(wm, tunable, target, tolerance=0.001, max_iter=10, settle=0.1, use_cache=True):
+    """
+    Tune a wavelength settable instrument until the wavelength measured by a wavelength meter reaches target.
+
+    The first setpoint is corrected by the offset curve learned for this unit in previous locks. Next setpoints
+    are calculated by secant method from the last two iterations, or by unit gain correction if only one is
+    available. The offset at lock is saved into local cache for next time.
+
+    :Parameters:
+        - **wm** - TypeWM, wavelength meter which measures the wavelength.
+        - **tunable** - instrument with set_wavelength, such as TypeOTF, TypeVOA, TypePOLC.
+        - **target** - float|int, target wavelength in nm.
+        - **tolerance** - float|int, max wavelength error in nm of lock.
+        - **max_iter** - int, max number of iterations.
+        - **settle** - float|int, time in seconds to wait after each setting before measurement.
+        - **use_cache** - bool, if use and update the learned offset curve.
+
+    :Returns: dict{"locked" => bool, "setpoint" => float, "wavelength" => float, "error" => float,
+        "iterations" => int, "time" => float}
+    """
+    if not isinstance(target, (float, int)):
+        raise TypeError('target should be number')
+    if not isinstance(max_iter, int):
+        raise TypeError('max_iter should be int')
+    if not max_iter >= 1:
+        raise ValueError('max_iter should >= 1')
+    try:
+        limits = (tunable.min_wavelength, tunable.max_wavelength)
+    except NotImplementedError:
+        limits = (float('-inf'), float('inf'))
+    key = _unit_key(tunable) if use_cache else None
+    start = time.perf_counter()
+    setpoint = target + (_learned_offset(key, target) if use_cache else 0.0)
+    previous = None
+    measured = error = None
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        setpoint = round(min(max(setpoint, limits[0]), limits[1]), 4)
+        tunable.set_wavelength(setpoint)
+        _settle(tunable, settle)
+        measured = wm.get_wavelength()
+        error = measured - target
+        if abs(error) <= tolerance:
+            break
+        slope = 1.0
+        if previous is not None and previous[0] != setpoint and previous[1] != measured:
+            slope = (measured - previous[1])/(setpoint - previous[0])
+            # secant slope far from unity means noisy measurement, fall back to unit gain
+            if not 0.5 <= slope <= 2:
+                slope = 1.0
+        previous = (setpoint, measured)
+        if iterations < max_iter:
+            setpoint = setpoint - error/slope
+    locked = abs(error) <= tolerance
+    if locked and use_cache:
+        _learn_offset(key, target, setpoint - measured)
+    return {'locked': locked, 'setpoint': setpoint, 'wavelength': measured, 'error': error,
+            'iterations': iterations, 'time': time.perf_counter() - start}
+
+
+def _att_limits(voa):
+    try:
+        max_att = voa.max_att
+    except NotImplementedError:
+        max_att = float('inf')
+    return 0.0, max_att
+
+
+def _power_step(voa, opm, target, tolerance, settle, limits):
+    """
+    One measurement and unit slope correction of power lock.
+
+    :Returns: tuple(float att at measurement, float measured power in dBm, float error in dB, bool if att is
+        changed)
+    """
+    att = voa.get_att()
+    measured = opm.get_dbm_value()
+    error = measured - target
+    if abs(error) <= tolerance:
+        return att, measured, error, False
+    new_att = round(min(max(att + error, limits[0]), limits[1]), 3)
+    if new_att == att:
+        return att, measured, error, False
+    voa.set_att(new_att)
+    _settle(voa, settle)
+    return att, measured, error, True
+
+
+def lock_power(voa, opm, target, tolerance=0.05, max_iter=5, settle=0.1):
+    """
+    Tune attenuation of a VOA until the power measured by a power meter reaches target.
+
+    Power in dB is modeled as linear in att with unit slope, so the first step usually lands within tolerance.
+    Later steps use the slope measured by secant method, clamped to [0.5, 2] against measurement noise. VOA and
+    power meter can be the same instrument, such as VOA with power monitor.
+
+    :Parameters:
+        - **voa** - TypeVOA, attenuator to tune.
+        - **opm** - TypeOPM, power meter after the attenuator.
+        - **target** - float|int, target power in dBm.
+        - **tolerance** - float|int, max power error in dB of lock.
+        - **max_iter** - int, max number of measurements.
+        - **settle** - float|int, time in seconds to wait after each setting before measurement.
+
+    :Returns: dict{"locked" => bool, "att" => float, "power" => float, "error" => float, "iterations" => int,
+        "time" => float}
+    """
+    if not isinstance(target, (float, int)):
+        raise TypeError('target should be number')
+    if not isinstance(max_iter, int):
+        raise TypeError('max_iter should be int')
+    if not max_iter >= 1:
+        raise ValueError('max_iter should >= 1')
+    limits = _att_limits(voa)
+    start = time.perf_counter()
+    slope = 1.0
+    previous = None
+    att = measured = error = None
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        att = voa.get_att()
+        measured = opm.get_dbm_value()
+        error = measured - target
+        if abs(error) <= tolerance or iterations == max_iter:
+            break
+        if previous is not None and previous[0] != att and previous[1] != measured:
+            # power decreases with att, slope is positive if the model holds
+            slope = (previous[1] - measured)/(att - previous[0])
+            if not 0.5 <= slope <= 2:
+                slope = 1.0
+        previous = (att, measured)
+        new_att = round(min(max(att + error/slope, limits[0]), limits[1]), 3)
+        if new_att == att:
+            break  # att is at its limit
+        voa.set_att(new_att)
+        _settle(voa, settle)
+    return {'locked': abs(error) <= tolerance, 'att': att, 'power': measured, 'error': error,
+            'iterations': iterations, 'time': time.perf_counter() - start}
+
+
+class PowerHold(object):
+    """
+    Hold output power of a VOA at target in a background thread, against drift of source power.
+
+    Power is measured at a fixed interval, and att is corrected by one dB-linear step if the error exceeds
+    tolerance. The latest state can be read at any time with ``get_state``.
+
+    Example::
+
+        with PowerHold(voa, opm, target=-10, interval=1):
+            run_test()
+    """
+
+    def __init__(self, voa, opm, target, tolerance=0.05, interval=1.0, settle=0.1):
+        """
+        :param voa: (TypeVOA) attenuator to tune
+        :param opm: (TypeOPM) power meter after the attenuator
+        :param target: (float|int) target power in dBm
+        :param tolerance: (float|int) max power error in dB before correction
+        :param interval: (int|float) interval in seconds between measurements
+        :param settle: (float|int) time in seconds to wait after each correction
+        """
+        if not interval > 0:
+            raise ValueError('interval should > 0')
+        self._voa = voa
+        self._opm = opm
+        self._target = target
+        self._tolerance = tolerance
+        self._interval = interval
+        self._settle = settle
+        self._limits = _att_limits(voa)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._state = {'att': None, 'power': None, 'error': None, 'corrections': 0, 'last_check': None,
+                       'exception': None}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def target(self):
+        return self._target
+
+    @target.setter
+    def target(self, value):
+        if not isinstance(value, (float, int)):
+            raise TypeError('target should be number')
+        self._target = value
+
+    def get_state(self):
+        """
+        :Returns: dict{"att" => float, "power" => float, "error" => float, "corrections" => int,
+            "last_check" => float, "exception" => str|None}
+        """
+        with self._lock:
+            return dict(self._state)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, lock=True):
+        """
+        Start holding. If lock is True, power is locked to target by lock_power first, in the calling thread.
+        """
+        if self.is_running():
+            return
+        if lock:
+            lock_power(self._voa, self._opm, self._target, self._tolerance, settle=self._settle)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='pyinst-power-hold', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                att, power, error, corrected = _power_step(self._voa, self._opm, self._target, self._tolerance,
+                                                           self._settle, self._limits)
+                exception = None
+            except Exception as e:
+                att = power = error = None
+                corrected = False
+                exception = '%s: %s' % (type(e).__name__, e)
+            with self._lock:
+                self._state.update(att=att, power=power, error=error, last_check=time.time(), exception=exception)
+                if corrected:
+                    self._state['corrections'] += 1
+            self._stop_event.wait(self._interval)
@@ -1,10 +1,24 @@
 import pyvisa
-from .models._VisaInstrument import rm
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .models._VisaInstrument import rm, PROFILE_CACHE, CAPABILITY_CACHE
+from .cache import clear_cache
 from .constants import InstrumentType
 from . import models
 
 
-__all__ = ['get_resource_manager', 'close_resource_manager', 'list_resources', 'list_resources_info', 'resource_info', 'get_instrument_lib']
+__all__ = ['get_resource_manager', 'close_resource_manager', 'list_resources', 'list_resources_info', 'resource_info', 'get_instrument_lib',
+           'clear_profile_cache', 'clear_capability_cache', 'discover_instruments', 'match_models']
+
+DISCOVERY_TIMEOUT = 500  # open/io timeout in ms for each resource probed by discover_instruments.
+# max concurrent probes on each interface board (such as GPIB0, TCPIP0) by interface type.
+DISCOVERY_CONCURRENCY = {'GPIB': 2, 'USB': 4, 'TCPIP': 16, 'ASRL': 16}
+DEFAULT_DISCOVERY_CONCURRENCY = 4
+
+# globals
+_discovery_cache = {}
+_discovery_lock = threading.Lock()
 
 
 def get_resource_manager():
@@ -85,3 +99,118 @@ def get_instrument_lib(detailed=True):
                 else:
                     model_lib[type_str].append(model_str)
     return model_lib
+
+
+def clear_profile_cache():
+    """
+    Remove all communication profiles (query delay, chunk size) learned by auto tuning of visa instruments.
+    """
+    clear_cache(PROFILE_CACHE)
+
+
+def clear_capability_cache():
+    """
+    Remove all cached capabilities (such as setting ranges) of instruments. They will be queried again on next open.
+    """
+    clear_cache(CAPABILITY_CACHE)
+
+
+def _normalize_name(name):
+    return re.sub('[^0-9A-Z]', '', name.upper())
+
+
+def match_models(idn):
+    """
+    Match an IDN string against brand and model of all model classes.
+
+    :Parameters: **idn** - str, reply of *IDN?, such as 'YOKOGAWA,AQ6370D,91K123456,02.08'
+
+    :Returns: Candidate model classes, the best match first.
+
+    :Return Type: list[{"class_name" => str, "brand" => str, "model" => str, "params" => list}]
+    """
+    fields = idn.split(',')
+    maker = _normalize_name(fields[0])
+    raw_model_field = (fields[1] if len(fields) > 1 else idn).strip()
+    model_field = _normalize_name(raw_model_field)
+    matched = []
+    for class_name, model_cls in models.__dict__.items():
+        if not class_name.startswith('Model'):
+            continue
+        brand_matched = bool(maker) and _normalize_name(model_cls.brand) in maker
+        model_names = model_cls.model if isinstance(model_cls.model, (tuple, list)) else [model_cls.model]
+        for model_name in model_names:
+            normalized = _normalize_name(model_name)
+            if normalized and normalized in model_field:
+                score = (brand_matched, len(normalized))
+                break
+        else:
+            pattern = getattr(model_cls, 'idn_pattern', None)
+            match = re.search(pattern, raw_model_field, re.I) if pattern else None
+            if match is None:
+                continue
+            model_name = model_names[0]
+            score = (brand_matched, len(match.group()))
+        matched.append((score, {'class_name': class_name, 'brand': model_cls.brand, 'model': model_name,
+                                'params': model_cls.params}))
+    matched.sort(key=lambda x: x[0], reverse=True)
+    return [i[1] for i in matched]
+
+
+def _probe_resource(resource_name, timeout, semaphore):
+    with semaphore:
+        try:
+            inst = rm.open_resource(resource_name, open_timeout=timeout, timeout=timeout)
+            try:
+                idn = inst.query('*IDN?').strip()
+            finally:
+                inst.close()
+        except (pyvisa.Error, OSError, ValueError) as e:
+            return {'resource_name': resource_name, 'idn': None, 'candidates': [], 'error': str(e)}
+    return {'resource_name': resource_name, 'idn': idn, 'candidates': match_models(idn), 'error': None}
+
+
+def discover_instruments(resources=None, timeout=DISCOVERY_TIMEOUT, max_workers=16, refresh=False):
+    """
+    Probe resources concurrently with *IDN? and match them against model classes.
+    Concurrent probes on the same interface board are limited by DISCOVERY_CONCURRENCY.
+    Successful results are cached between calls, set refresh to True to probe again. Failed probes are not
+    cached, they are probed again in the next call.
+
+    :Parameters:
+        - **resources** - list[str]|None, resource names to probe. All connected resources if None.
+        - **timeout** - int, open/io timeout in ms for each resource.
+        - **max_workers** - int, max number of resources probed at the same time.
+        - **refresh** - bool, if ignore the cached results.
+
+    :Returns: Probe result of each resource. The model class of a candidate can be constructed by
+        ``getattr(pyinst, class_name)(resource_name, *params)``.
+
+    :Return Type: list[{"resource_name" => str, "idn" => str|None, "candidates" => list, "error" => str|None}]
+    """
+    if resources is None:
+        resources = list_resources()
+    with _discovery_lock:
+        to_probe = [r for r in resources if refresh or r not in _discovery_cache]
+    semaphores = {}
+    for resource_name in to_probe:
+        board = resource_name.split('::')[0].upper()
+        if board not in semaphores:
+            interface = re.match('[A-Z]*', board).group()
+            limit = DISCOVERY_CONCURRENCY.get(interface, DEFAULT_DISCOVERY_CONCURRENCY)
+            semaphores[board] = threading.Semaphore(limit)
+    probed = {}
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_probe_resource, r, timeout, semaphores[r.split('::')[0].upper()])
+                       for r in to_probe]
+            results = [f.result() for f in futures]
+        with _discovery_lock:
+            for result in results:
+                probed[result['resource_name']] = result
+                if result['error'] is None:
+                    _discovery_cache[result['resource_name']] = result
+                else:
+                    _discovery_cache.pop(result['resource_name'], None)
+    with _discovery_lock:
+        return [dict(probed[r] if r in probed else _discovery_cache[r]) for r in resources]
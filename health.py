@@ -0,0 +1,203 @@
+import threading
+import time
+
+
+__all__ = ['HealthMonitor']
+
+KEEPALIVE_INTERVAL = 60  # default interval in seconds between keepalive probes.
+KEEPALIVE_TIMEOUT = 1000  # default timeout in ms of each keepalive probe.
+RECONNECT_AFTER = 3  # default number of consecutive failed probes before the session is reopened.
+
+
+class HealthMonitor(object):
+    """
+    Background connection health monitor.
+
+    Instruments are probed with their cheap ``ping`` at a fixed interval in a daemon thread. If the probe fails
+    for reconnect_after consecutive times, the session is reopened with ``reopen`` and probed again. A single
+    failure, such as a probe delayed by a long operation, only marks the instrument "lost". Instruments busy with I/O in other threads are not
+    probed, since they are obviously in use. Health state can be read at any time without blocking the caller.
+
+    Health state of each instrument:
+        - **state** - str, "unknown"|"ok"|"lost"
+        - **last_check** - float|None, timestamp of last probe
+        - **last_ok** - float|None, timestamp of last successful probe
+        - **latency** - float|None, duration in seconds of last successful probe
+        - **failures** - int, number of consecutive failed probes
+        - **reconnects** - int, number of successful reopens
+        - **error** - str|None, error of last failed reopen
+    """
+
+    def __init__(self, instruments=None, interval=KEEPALIVE_INTERVAL, timeout=KEEPALIVE_TIMEOUT, reconnect=True,
+                 on_change=None, reconnect_after=RECONNECT_AFTER):
+        """
+        :param instruments: (dict|list|None) instruments to monitor, a dict maps alias to instrument
+        :param interval: (int|float) interval in seconds between probes
+        :param timeout: (int) timeout in ms of each probe
+        :param reconnect: (bool) if reopen session after probe failed
+        :param on_change: (callable|None) called with (alias, state) when state of an instrument changes
+        :param reconnect_after: (int) number of consecutive failed probes before the session is reopened
+        """
+        if not isinstance(interval, (int, float)):
+            raise TypeError('interval should be number')
+        if not interval > 0:
+            raise ValueError('interval should > 0')
+        self._interval = interval
+        self._timeout = timeout
+        self._reconnect = reconnect
+        if not isinstance(reconnect_after, int):
+            raise TypeError('reconnect_after should be int')
+        if not reconnect_after >= 1:
+            raise ValueError('reconnect_after should >= 1')
+        self._reconnect_after = reconnect_after
+        self._on_change = on_change
+        self._instruments = {}
+        self._health = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        if isinstance(instruments, dict):
+            for alias, inst in instruments.items():
+                self.add(inst, alias)
+        elif instruments:
+            for inst in instruments:
+                self.add(inst)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    @property
+    def interval(self):
+        return self._interval
+
+    def add(self, instrument, alias=None):
+        """
+        Add an instrument to monitor.
+
+        :Parameters:
+            - **instrument** - instrument object
+            - **alias** - str|None, alias of instrument, resource name is used if None.
+        """
+        if alias is None:
+            alias = instrument.resource_name
+        with self._lock:
+            self._instruments[alias] = instrument
+            self._health[alias] = {'state': 'unknown', 'last_check': None, 'last_ok': None, 'latency': None,
+                                   'failures': 0, 'reconnects': 0, 'error': None}
+
+    def remove(self, alias):
+        with self._lock:
+            self._instruments.pop(alias, None)
+            self._health.pop(alias, None)
+
+    def get_health(self, alias=None):
+        """
+        Get health state without blocking.
+
+        :Parameters: **alias** - str|None, alias of instrument, all instruments if None.
+
+        :Return Type: dict, health state of the instrument, or mapping of alias to health state.
+        """
+        with self._lock:
+            if alias is not None:
+                return dict(self._health[alias])
+            return {a: dict(h) for a, h in self._health.items()}
+
+    def is_healthy(self, alias):
+        with self._lock:
+            return self._health[alias]['state'] == 'ok'
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start background monitoring.
+        """
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='pyinst-health-monitor', daemon=True)
+        self._thread.start()
+
+    def stop(self, wait=True):
+        """
+        Stop background monitoring.
+        """
+        self._stop_event.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def check_now(self):
+        """
+        Probe all instruments once in the calling thread.
+        """
+        with self._lock:
+            items = list(self._instruments.items())
+        for alias, inst in items:
+            if self._stop_event.is_set() and threading.current_thread() is self._thread:
+                break
+            self._check(alias, inst)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self.check_now()
+            self._stop_event.wait(self._interval)
+
+    def _check(self, alias, inst):
+        io_lock = getattr(inst, '_io_lock', None)
+        if io_lock is not None and not io_lock.acquire(blocking=False):
+            return  # instrument is busy, skip this round
+        try:
+            start = time.time()
+            ok = self._ping(inst)
+            latency = time.time() - start
+            error = None
+            reconnected = False
+            with self._lock:
+                health = self._health.get(alias)
+                failures = health['failures'] if health is not None else 0
+            if not ok and self._reconnect and failures + 1 >= self._reconnect_after:
+                try:
+                    inst.reopen()
+                    ok = self._ping(inst)
+                    reconnected = ok
+                except Exception as e:
+                    error = '%s: %s' % (type(e).__name__, e)
+        finally:
+            if io_lock is not None:
+                io_lock.release()
+        self._update(alias, ok, start, latency, reconnected, error)
+
+    def _ping(self, inst):
+        try:
+            return bool(inst.ping(self._timeout))
+        except Exception:
+            return False
+
+    def _update(self, alias, ok, timestamp, latency, reconnected, error):
+        with self._lock:
+            health = self._health.get(alias)
+            if health is None:
+                return  # removed during probe
+            previous = health['state']
+            health['last_check'] = timestamp
+            health['error'] = error
+            if ok:
+                health['state'] = 'ok'
+                health['last_ok'] = timestamp
+                health['latency'] = None if reconnected else latency
+                health['failures'] = 0
+                if reconnected:
+                    health['reconnects'] += 1
+            else:
+                health['state'] = 'lost'
+                health['failures'] += 1
+            state = health['state']
+        if state != previous and self._on_change is not None:
+            self._on_change(alias, state)
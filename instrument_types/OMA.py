@@ -1,4 +1,8 @@
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
+import numpy as np
+import time
+
+ACQUIRE_TIMEOUT = 60  # default max time in seconds to wait for each measurement while acquiring.
 
 
 class TypeOMA(BaseInstrumentType):
@@ -66,3 +70,109 @@ class TypeOMA(BaseInstrumentType):
         :Return Type: dict{item_name => tuple(float value, str unit)}
         """
         self._raise_not_implemented()
+
+    def _start_measurement(self):
+        """
+        Start a new measurement, whose completion can be checked by _is_measurement_complete. Models should
+        rewrite it to support acquire.
+        """
+        self._raise_not_implemented()
+
+    def _is_measurement_complete(self):
+        """
+        Check if the measurement started by _start_measurement is completed.
+
+        :Returns: bool, if measurement is completed and results are ready.
+        """
+        self._raise_not_implemented()
+
+    def _resume_measurement(self):
+        """
+        Resume free running measurement after acquire.
+        """
+        self.run()
+
+    def _fetch_traces_values(self, traces):
+        """
+        Fetch values of several traces from the same measurement. Models should rewrite it to fetch all traces
+        in one message.
+
+        :Returns: dict{int trace => numpy.ndarray values}
+        """
+        return {t: np.array(self.get_trace_values(t), dtype=float) for t in traces}
+
+    def _get_trace_schema(self, trace):
+        """
+        Get names and units of all test items of a trace, which should describe the same trace layout. Models
+        should rewrite it to get both from one message or cache.
+
+        :Returns: tuple(list[str] items, list[str] units)
+        """
+        return self.get_trace_items(trace), self.get_trace_units(trace)
+
+    def acquire(self, n, traces=(1,), writer=None, timeout=ACQUIRE_TIMEOUT, interval=0.01, resume=True):
+        """
+        Acquire n measurements and calculate statistics of each test item. Each measurement is started and waited
+        for completion by status polling, so each result set is harvested exactly once. Statistics are
+        accumulated by Welford's method, memory usage does not grow with n.
+
+        :Parameters:
+            - **n** - int, number of measurements.
+            - **traces** - list[int], indexes of traces, 1 based.
+            - **writer** - MeasurementWriter|None, raw values of each measurement are appended to it if not None,
+              one dataset "trace<index>" per trace.
+            - **timeout** - int|float, raise TimeoutError if a measurement is not completed in timeout seconds.
+            - **interval** - int|float, initial interval in seconds of status polling.
+            - **resume** - bool, if resume free running measurement after acquire.
+
+        :Returns: Mapping of trace index to statistics, arrays are in order of test items.
+
+        :Return Type: dict{int trace => dict{"items" => list[str], "units" => list[str], "count" => int,
+            "mean" => ndarray, "std" => ndarray, "min" => ndarray, "max" => ndarray}}
+        """
+        if not isinstance(n, int):
+            raise TypeError('n should be int')
+        if not n >= 1:
+            raise ValueError('n should >= 1')
+        traces = list(traces)
+        stats = {}
+        for t in traces:
+            items, units = self._get_trace_schema(t)
+            stats[t] = {'items': items, 'units': units, 'count': 0}
+        try:
+            for _ in range(n):
+                self._start_measurement()
+                start = time.perf_counter()
+                wait = interval
+                while not self._is_measurement_complete():
+                    if time.perf_counter() - start > timeout:
+                        raise TimeoutError('Measurement of %s is not completed in %s seconds' % (self.model, timeout))
+                    time.sleep(wait)
+                    wait = min(wait*1.5, 0.5)
+                timestamp = time.time()
+                for t, values in self._fetch_traces_values(traces).items():
+                    st = stats[t]
+                    if values.size != len(st['items']):
+                        raise ValueError('Number of values of trace %d changed during acquire' % t)
+                    st['count'] += 1
+                    if st['count'] == 1:
+                        st['mean'] = values.copy()
+                        st['m2'] = np.zeros_like(values)
+                        st['min'] = values.copy()
+                        st['max'] = values.copy()
+                    else:
+                        delta = values - st['mean']
+                        st['mean'] += delta/st['count']
+                        st['m2'] += delta*(values - st['mean'])
+                        np.minimum(st['min'], values, out=st['min'])
+                        np.maximum(st['max'], values, out=st['max'])
+                    if writer is not None:
+                        writer.append('trace%d' % t, dict(zip(st['items'], zip(values.tolist(), st['units']))),
+                                      instrument=self, timestamp=timestamp)
+        finally:
+            if resume:
+                self._resume_measurement()
+        for st in stats.values():
+            m2 = st.pop('m2')
+            st['std'] = np.sqrt(m2/(st['count'] - 1)) if st['count'] > 1 else np.zeros_like(m2)
+        return stats
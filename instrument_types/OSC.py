@@ -1,5 +1,6 @@
 from abc import abstractmethod
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
+import numpy as np
 
 
 class TypeOSC(BaseInstrumentType):
@@ -35,3 +36,33 @@ class TypeOSC(BaseInstrumentType):
         category: str, example: MIN, MEAN
         return: value, unit
         """
+
+    def reset_statistics(self):
+        """
+        Reset accumulated statistics (MEAN, MINImum, MAXimum etc.) of all measurements, so that following
+        statistics only include new acquisitions. Models should rewrite it.
+        """
+        raise NotImplementedError('This model can not reset measurement statistics.')
+
+    def get_measurements(self, slots, categories=('VALue',)):
+        """
+        Get several statistics of several slots. Models should rewrite it to read all in one message.
+        slots: list of int
+        categories: list of str, example: VALue, MIN, MEAN
+        return: dict, {'slot': numpy.ndarray of slots, 'unit': list of str, category: numpy.ndarray of values}
+        """
+        slots = list(slots)
+        table = {'slot': np.array(slots), 'unit': [self.get_measurement(slot, 'UNIT') for slot in slots]}
+        for category in categories:
+            table[category] = np.array([self.get_measurement(slot, category) for slot in slots], dtype=float)
+        return table
+
+    @abstractmethod
+    def get_waveform(self, source, start=1, stop=None):
+        """
+        Get waveform data of a source by binary transfer.
+        source: str, CH<x>|MATH<y>|REF<x>
+        start: int, first point of record, 1 based
+        stop: int|None, last point of record, the end of record if None
+        return: tuple(numpy.ndarray time in s, numpy.ndarray value in vertical unit, usually V)
+        """
@@ -1,9 +1,18 @@
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
+from concurrent.futures import Future
 from time import sleep
+import threading
+import time
+
+PEAK_SEARCH_TIMEOUT = 30  # default max time in seconds of peak search.
+SETTLE_TIMEOUT = 10  # default max time in seconds to wait for filter settling after tuning.
 
 
 class TypeOTF(BaseInstrumentType):
     """Optical Tunable Filter."""
+    # characterized time in seconds for the filter to settle after tuning, used by models without setting state.
+    settle_time = None
+
     def __init__(self, *args, **kwargs):
         super(TypeOTF, self).__init__()
         self._append_ins_type(InstrumentType.OTF)
@@ -14,6 +23,8 @@ class TypeOTF(BaseInstrumentType):
         self._max_freq = None
         self._min_bw = None
         self._max_bw = None
+        self._last_tune_time = None
+        self.last_settle_time = None  # time in seconds from the last tuning to settled, measured by wait_settled.
 
     # -- properties --
     # min_wavelength
@@ -97,11 +108,13 @@ class TypeOTF(BaseInstrumentType):
         """
         self._raise_not_implemented()
 
-    def set_wavelength(self, value):
+    def set_wavelength(self, value, wait=False):
         """
         Set center wavelength in nm.
         
-        :Parameters: **value** - float, center wavelength in nm.
+        :Parameters:
+            - **value** - float, center wavelength in nm.
+            - **wait** - bool, if wait until the filter is settled, see wait_settled.
         """
         self._raise_not_implemented()
 
@@ -113,11 +126,13 @@ class TypeOTF(BaseInstrumentType):
         """
         self._raise_not_implemented()
 
-    def set_frequency(self, value):
+    def set_frequency(self, value, wait=False):
         """
         Set center frequency in THz.
 
-        :Parameters: **value** - float|int, optical frequency in THz
+        :Parameters:
+            - **value** - float|int, optical frequency in THz
+            - **wait** - bool, if wait until the filter is settled, see wait_settled.
         """
         self._raise_not_implemented()
 
@@ -145,11 +160,13 @@ class TypeOTF(BaseInstrumentType):
         """
         self._raise_not_implemented()
 
-    def set_bandwidth(self, value):
+    def set_bandwidth(self, value, wait=False):
         """
         Set filter bandwidth.
 
-        :Parameters: **value** - float|int, bandwidth setting value in nm
+        :Parameters:
+            - **value** - float|int, bandwidth setting value in nm
+            - **wait** - bool, if wait until the filter is settled, see wait_settled.
         """
         self._raise_not_implemented()
 
@@ -169,12 +186,142 @@ class TypeOTF(BaseInstrumentType):
         """
         self._raise_not_implemented()
 
-    def peak_search(self, center, span):
+    def _is_tuning(self):
+        """
+        Get setting state of the filter. Models which can read the setting state should rewrite it.
+
+        :Returns: bool, if wavelength or bandwidth setting is in operation.
+        """
+        raise NotImplementedError('This model has no setting state.')
+
+    def _check_wait(self, wait):
+        """
+        Called by models before each tuning command, so that an unsupported wait fails before the filter moves.
+        """
+        if wait and self.settle_time is None and type(self)._is_tuning is TypeOTF._is_tuning:
+            raise NotImplementedError('%s can not wait until settled: no setting state or settle time.' % self.model)
+
+    def _tuned(self, wait):
+        """
+        Called by models after each tuning command.
+        """
+        self._last_tune_time = time.perf_counter()
+        if wait:
+            self.wait_settled()
+
+    def wait_settled(self, timeout=SETTLE_TIMEOUT):
+        """
+        Wait until the filter is settled after the last tuning. The setting state is polled if the model can
+        read it, otherwise the characterized settle_time of the model is waited from the last tuning.
+
+        :Parameters: **timeout** - int|float, max time in seconds to wait.
+
+        :Returns: float, time in seconds from the last tuning to settled, also kept in last_settle_time.
+        """
+        start = self._last_tune_time if self._last_tune_time is not None else time.perf_counter()
+        try:
+            tuning = self._is_tuning()
+        except NotImplementedError:
+            if self.settle_time is None:
+                self._raise_not_implemented()
+            remaining = start + self.settle_time - time.perf_counter()
+            if remaining > 0:
+                sleep(remaining)
+        else:
+            interval = 0.005
+            while tuning:
+                if time.perf_counter() - start > timeout:
+                    raise TimeoutError('%s is not settled in %s seconds' % (self.model, timeout))
+                sleep(interval)
+                interval = min(interval*1.5, 0.05)
+                tuning = self._is_tuning()
+        self.last_settle_time = time.perf_counter() - start
+        return self.last_settle_time
+
+    def _start_peak_search(self, center, span):
+        """
+        Set peak search range and start peak search. Models with peak search should rewrite it.
+        """
+        self._raise_not_implemented()
+
+    def _is_peak_search_complete(self):
+        """
+        :Returns: bool, if peak search is completed.
+        """
+        self._raise_not_implemented()
+
+    def _cancel_peak_search(self):
+        """
+        Cancel running peak search.
+        """
+        self._raise_not_implemented()
+
+    def _wait_peak_search(self, timeout, cancelled=None):
         """
-        Search peak near the given center wavelength.
+        Poll until peak search is completed. Polling is fast at first and backs off, since a search takes from
+        a fraction of second to seconds. Peak search is canceled on timeout.
+
+        :Returns: bool, False if cancelled is set during waiting.
+        """
+        start = time.perf_counter()
+        interval = 0.02
+        while True:
+            sleep(interval)
+            if cancelled is not None and cancelled():
+                self._cancel_peak_search()
+                return False
+            if self._is_peak_search_complete():
+                return True
+            if time.perf_counter() - start > timeout:
+                self._cancel_peak_search()
+                raise TimeoutError('Peak search of %s is not completed in %s seconds' % (self.model, timeout))
+            interval = min(interval*1.5, 0.5)
+
+    def peak_search(self, center, span, timeout=PEAK_SEARCH_TIMEOUT):
+        """
+        Search peak near the given center wavelength, and block until it is completed.
 
         :Parameters:
             - **center** - int|float, center wavelength in nm.
             - **span** - int|float, span in nm.
+            - **timeout** - int|float, max time in seconds, peak search is canceled and TimeoutError is raised
+              after it.
+
+        :Returns: float, center wavelength in nm found by peak search.
+        """
+        self._start_peak_search(center, span)
+        self._wait_peak_search(timeout)
+        return self.get_wavelength()
+
+    def peak_search_async(self, center, span, timeout=PEAK_SEARCH_TIMEOUT):
+        """
+        Start peak search and return immediately, so that several filters can search in parallel.
+
+        The result is the center wavelength in nm found by peak search. Calling ``cancel()`` of the future before
+        it is done cancels the peak search on the filter.
+
+        :Parameters: same as peak_search.
+
+        :Returns: concurrent.futures.Future
         """
-        self._raise_not_implemented()
\ No newline at end of file
+        self._start_peak_search(center, span)
+        future = Future()
+
+        def wait():
+            try:
+                completed = self._wait_peak_search(timeout, future.cancelled)
+            except BaseException as e:
+                if future.set_running_or_notify_cancel():
+                    future.set_exception(e)
+                return
+            if not completed:
+                return
+            if not future.set_running_or_notify_cancel():
+                return  # cancelled just after completion, nothing to cancel on the filter
+            try:
+                future.set_result(self.get_wavelength())
+            except BaseException as e:
+                future.set_exception(e)
+
+        threading.Thread(target=wait, name='pyinst-peak-search', daemon=True).start()
+        return future
@@ -1,4 +1,6 @@
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
+import time
+import numpy as np
 
 
 class TypeVOA(BaseInstrumentType):
@@ -168,4 +170,55 @@ class TypeVOA(BaseInstrumentType):
         self._raise_not_implemented()
 
     def set_frequency(self, value):
-        self._raise_not_implemented()
\ No newline at end of file
+        self._raise_not_implemented()
+
+    def _readback_and_set_att(self, opm, next_value):
+        """
+        Read the result of current sweep step, then set att of next step. Models can rewrite it to do both in
+        one message.
+
+        :Parameters:
+            - **opm** - TypeOPM|None, read power from opm, or read att setting back if None.
+            - **next_value** - float|None, att value in dB of next step, None for the last step.
+
+        :Returns: float, measured value of current step.
+        """
+        measured = opm.get_power_value() if opm is not None else self.get_att()
+        if next_value is not None:
+            self.set_att(next_value)
+        return measured
+
+    def iter_sweep(self, att_values, opm=None, settle=0.05):
+        """
+        Step att through values, and yield measured value of each step. The att of next step is set right after
+        reading the current step.
+
+        :Parameters:
+            - **att_values** - array like of float, att values in dB.
+            - **opm** - TypeOPM|None, power meter to read at each step, in its selected power unit. If None, the
+              att setting is read back.
+            - **settle** - float|int, time in seconds to wait after each setting before reading.
+
+        :Yields: tuple(float att value in dB, float measured value)
+        """
+        values = np.asarray(att_values, dtype=float).ravel()
+        if values.size == 0:
+            return
+        self.set_att(float(values[0]))
+        for i, value in enumerate(values):
+            if settle:
+                time.sleep(settle)
+            next_value = float(values[i + 1]) if i + 1 < values.size else None
+            yield float(value), self._readback_and_set_att(opm, next_value)
+
+    def sweep(self, att_values, opm=None, settle=0.05):
+        """
+        Step att through values and read at each step, see iter_sweep.
+
+        :Returns: dict{"att" => numpy.ndarray att values in dB, "measured" => numpy.ndarray measured values}
+        """
+        values = np.asarray(att_values, dtype=float).ravel()
+        measured = np.empty(values.size)
+        for i, (_, m) in enumerate(self.iter_sweep(values, opm, settle)):
+            measured[i] = m
+        return {'att': values, 'measured': measured}
@@ -1,11 +1,16 @@
 from abc import abstractmethod
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
+import hashlib
+import time
+import numpy as np
 
 
 class TypeWGEN(BaseInstrumentType):
     def __init__(self, *args, **kwargs):
         super(TypeWGEN, self).__init__()
         self._append_ins_type(InstrumentType.WGEN)
+        self._arbitrary_hash = None  # hash of the last uploaded arbitrary waveform.
+        self._wgen_state = {}  # known parameter values, see configure.
 
     @abstractmethod
     def set_frequency(self, frequency):
@@ -121,4 +126,166 @@ class TypeWGEN(BaseInstrumentType):
         return: float
         """
 
-    
\ No newline at end of file
+    # parameters of configure, in order of applying.
+    _configure_params = ('function', 'frequency', 'amplitude', 'offset', 'high', 'low', 'output')
+    # setting a parameter changes the parameters coupled with it.
+    _coupled_params = {
+        'amplitude': ('high', 'low'),
+        'offset': ('high', 'low'),
+        'high': ('amplitude', 'offset'),
+        'low': ('amplitude', 'offset'),
+    }
+
+    def _update_wgen_state(self, **params):
+        """
+        Record parameters set to instrument, and forget parameters coupled with them.
+        """
+        for name, value in params.items():
+            for coupled in self._coupled_params.get(name, ()):
+                self._wgen_state.pop(coupled, None)
+        self._wgen_state.update(params)
+
+    def invalidate_wgen_state(self):
+        """
+        Forget known parameter values and uploaded arbitrary waveform, for example after settings are changed from
+        front panel.
+        """
+        self._wgen_state.clear()
+        self._arbitrary_hash = None
+
+    def _apply_configure(self, params):
+        """
+        Send parameters to instrument in one message. Models should rewrite it.
+        params: dict, {name: value} in order of _configure_params
+        """
+        self._raise_not_implemented()
+
+    def configure(self, force=False, **params):
+        """
+        Set several parameters at once. Only parameters different from the known state are sent, in one message.
+        force: bool, send all given parameters regardless of known state
+        params: function (str), frequency (Hz), amplitude (V), offset (V), high (V), low (V), output (bool)
+        return: dict, parameters actually sent
+        """
+        unknown = set(params) - set(self._configure_params)
+        if unknown:
+            raise ValueError('Invalid parameters: %s' % ', '.join(sorted(unknown)))
+        if {'amplitude', 'offset'} & set(params) and {'high', 'low'} & set(params):
+            raise ValueError('amplitude/offset and high/low should not be set together')
+        changed = {name: params[name] for name in self._configure_params
+                   if name in params and (force or self._wgen_state.get(name) != params[name])}
+        if changed:
+            try:
+                self._apply_configure(changed)
+            except Exception:
+                self._wgen_state.clear()
+                raise
+            self._update_wgen_state(**changed)
+        return changed
+
+    # range of DAC codes and max number of points of arbitrary waveform, models should rewrite them.
+    _arbitrary_dac_range = None
+    _arbitrary_max_points = None
+
+    def _write_arbitrary(self, dac):
+        """
+        Transfer DAC codes of arbitrary waveform to instrument. Models should rewrite it.
+        dac: numpy.ndarray of int16
+        """
+        self._raise_not_implemented()
+
+    def load_arbitrary(self, samples, force=False):
+        """
+        Load arbitrary waveform. Samples are normalized to full scale by peak absolute value, and quantized to
+        DAC codes. If the codes are identical to the last upload, the transfer is skipped.
+        samples: array like of float, one period of waveform
+        force: bool, upload even if identical to the last upload
+        return: bool, if waveform is transferred
+        """
+        if self._arbitrary_dac_range is None:
+            self._raise_not_implemented()
+        samples = np.asarray(samples, dtype=float)
+        if samples.ndim != 1 or samples.size < 2:
+            raise ValueError('samples should be 1-D with at least 2 points')
+        if self._arbitrary_max_points is not None and samples.size > self._arbitrary_max_points:
+            raise ValueError('Too many points of arbitrary waveform: %d > %d' % (
+                samples.size, self._arbitrary_max_points))
+        if not np.isfinite(samples).all():
+            raise ValueError('samples should be finite')
+        dac_min, dac_max = self._arbitrary_dac_range
+        peak = np.abs(samples).max()
+        normalized = samples/peak if peak > 0 else samples
+        dac = np.clip(np.rint(normalized*dac_max), dac_min, dac_max).astype(np.int16)
+        digest = hashlib.sha1(dac.tobytes()).hexdigest()
+        if not force and digest == self._arbitrary_hash:
+            return False
+        self._arbitrary_hash = None
+        self._write_arbitrary(dac)
+        self._arbitrary_hash = digest
+        return True
+
+    def frequency_sweep(self, start, stop, points, dwell=0.1, spacing='lin', osc=None, slots=(1,),
+                        categories=('VALue',)):
+        """
+        Step frequency from start to stop, and optionally read oscilloscope measurements at each step.
+
+        Steps are timed by host, one after another, on a fixed schedule: each step starts at (index * dwell) from
+        the start of sweep, so latency of setting and reading does not accumulate, but each dwell should be longer
+        than the time to set frequency and read measurements. With oscilloscope, all slots and categories are read
+        in one get_measurements call at the end of each dwell. Statistics of osc are reset after each frequency
+        step, so that statistics such as MEAN only include acquisitions of that step. If osc can not reset
+        statistics, only VALue should be used.
+
+        start: float|int, start frequency in Hz
+        stop: float|int, stop frequency in Hz
+        points: int, number of steps
+        dwell: float|int, time in seconds of each step
+        spacing: str, 'lin'|'log'
+        osc: TypeOSC|None, oscilloscope which measures the response
+        slots: list of int, measurement slots of osc
+        categories: list of str, statistics of each slot, see TypeOSC.get_measurements
+        return: dict, {'frequency': numpy.ndarray, 'time': numpy.ndarray start time of each step},
+            with osc also {'unit': list of str, category: numpy.ndarray of shape (points, slots)}
+        """
+        if not isinstance(points, int):
+            raise TypeError('points should be int')
+        if not points >= 2:
+            raise ValueError('points should >= 2')
+        if spacing == 'lin':
+            frequencies = np.linspace(start, stop, points)
+        elif spacing == 'log':
+            if not (start > 0 and stop > 0):
+                raise ValueError('start and stop should > 0 for log spacing')
+            frequencies = np.geomspace(start, stop, points)
+        else:
+            raise ValueError('Invalid spacing: %r' % spacing)
+        slots = list(slots)
+        times = np.empty(points)
+        result = {'frequency': frequencies, 'time': times}
+        reset = osc is not None
+        if osc is not None:
+            for category in categories:
+                result[category] = np.empty((points, len(slots)))
+        t0 = time.perf_counter()
+        for i, frequency in enumerate(frequencies):
+            delay = t0 + i*dwell - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            times[i] = time.perf_counter() - t0
+            self.set_frequency(float(frequency))
+            if reset:
+                try:
+                    osc.reset_statistics()
+                except NotImplementedError:
+                    reset = False
+                    if any(c.upper() not in ('VAL', 'VALUE') for c in categories):
+                        raise
+            if osc is not None:
+                delay = t0 + (i + 1)*dwell - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                table = osc.get_measurements(slots, categories)
+                for category in categories:
+                    result[category][i] = table[category]
+                result['unit'] = table['unit']
+        return result
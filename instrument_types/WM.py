@@ -1,11 +1,19 @@
 from ._BaseInstrumentType import BaseInstrumentType, InstrumentType
 from ..utils import dbm_to_w, w_to_dbm
+import numpy as np
+import time
+
+# dtype of peak snapshot: wavelength in nm, power in selected unit.
+PEAK_DTYPE = np.dtype([('wavelength', 'f8'), ('power', 'f8')])
+STREAM_TIMEOUT = 10  # default max time in seconds to wait for a new measurement cycle while streaming.
+STREAM_PERIOD = 0.1  # assumed refresh period in seconds for streaming, if it is not given or observed.
 
 
 class TypeWM(BaseInstrumentType):
     def __init__(self, *args, **kwargs):
         super(TypeWM, self).__init__()
         self._append_ins_type(InstrumentType.WM)
+        self._stream_stats = {'samples': 0, 'polls': 0, 'elapsed': 0.0, 'rate': 0.0}
 
     def run(self):
         """
@@ -91,4 +99,135 @@ class TypeWM(BaseInstrumentType):
         if unit == 1:
             return value
         elif unit == 0:
-            return dbm_to_w(value)
\ No newline at end of file
+            return dbm_to_w(value)
+
+    def get_peaks(self):
+        """
+        Get wavelength and power of all peaks from the same measurement cycle.
+
+        :Returns: numpy structured array of dtype PEAK_DTYPE, fields: wavelength in nm, power in selected unit.
+        """
+        self._raise_not_implemented()
+
+    def _get_measurement_count(self):
+        """
+        Get measurement counter, which increases with each measurement cycle. Models with such a counter should
+        rewrite this method, so that streaming fetches each cycle only once.
+
+        :Returns: int, measurement counter.
+        """
+        raise NotImplementedError('This model has no measurement counter.')
+
+    def _is_new_measurement(self):
+        """
+        Check and clear the event of a completed measurement cycle, such as a bit of an event register. Models
+        with such an event should rewrite this method if they have no measurement counter.
+
+        :Returns: bool, if a new measurement cycle completed since the last call.
+        """
+        raise NotImplementedError('This model has no measurement event.')
+
+    def _fetch_sample(self):
+        """
+        Fetch wavelength and power of single peak. Models should rewrite it to fetch both in one message.
+
+        :Returns: tuple(float wavelength in nm, float power in selected unit)
+        """
+        return self.get_wavelength(), self.get_power_value()
+
+    def stream(self, count=None, duration=None, timeout=STREAM_TIMEOUT, poll_interval=0.002, period=None):
+        """
+        Yield each new measurement cycle of single peak. Repeat measurement should be started before streaming.
+
+        If the model has a measurement counter or a measurement event, only it is polled until a new cycle
+        arrives, and each cycle is fetched once. Otherwise the sample is fetched at half of the refresh period,
+        and only changed values are yielded: cycles with the same reading as the previous one can not be told
+        apart, so they are skipped rather than guessed, and the timeout does not apply to them. After each new
+        cycle, polling pauses for half of the refresh period to reduce bus load.
+
+        :Parameters:
+            - **count** - int|None, stop after count cycles.
+            - **duration** - int|float|None, stop after duration in seconds.
+            - **timeout** - int|float, raise TimeoutError if no new cycle arrives in timeout seconds.
+            - **poll_interval** - int|float, min time in seconds between polls.
+            - **period** - int|float|None, refresh period in seconds of the meter. It is estimated as the shortest
+              interval between new cycles if None, STREAM_PERIOD until observed.
+
+        :Yields: dict{"timestamp" => float, "wavelength" => float, "power" => float}
+        """
+        try:
+            last_count = self._get_measurement_count()
+            has_counter = True
+        except NotImplementedError:
+            last_count = None
+            has_counter = False
+        has_event = False
+        if not has_counter:
+            try:
+                self._is_new_measurement()  # clear the event of the cycle before streaming
+                has_event = True
+            except NotImplementedError:
+                pass
+        fixed_period = period
+        last_sample = None
+        start = time.perf_counter()
+        last_new = start
+        last_alive = start  # time of the latest new cycle, or of the latest response in the fallback
+        samples = 0
+        polls = 0
+        self._stream_stats = {'samples': 0, 'polls': 0, 'elapsed': 0.0, 'rate': 0.0}
+        try:
+            while count is None or samples < count:
+                now = time.perf_counter()
+                if duration is not None and now - start >= duration:
+                    break
+                if now - last_alive > timeout:
+                    raise TimeoutError('No new measurement cycle in %s seconds' % timeout)
+                polls += 1
+                sample = None
+                if has_counter:
+                    current_count = self._get_measurement_count()
+                    if current_count != last_count:
+                        last_count = current_count
+                        sample = self._fetch_sample()
+                elif has_event:
+                    if self._is_new_measurement():
+                        sample = self._fetch_sample()
+                else:
+                    fetched = self._fetch_sample()
+                    if fetched != last_sample:
+                        sample = fetched
+                    else:
+                        # the meter responds, but an unchanged reading is not taken as a new cycle
+                        last_alive = time.perf_counter()
+                if sample is None:
+                    if has_counter or has_event:
+                        time.sleep(poll_interval)
+                    else:
+                        time.sleep(max(poll_interval, (period or STREAM_PERIOD)/2))
+                    continue
+                now = time.perf_counter()
+                if last_sample is not None and fixed_period is None:
+                    interval = now - last_new
+                    period = interval if period is None else min(period, interval)
+                last_sample = sample
+                last_new = last_alive = now
+                samples += 1
+                elapsed = now - start
+                self._stream_stats = {'samples': samples, 'polls': polls, 'elapsed': elapsed,
+                                      'rate': samples/elapsed if elapsed > 0 else 0.0}
+                yield {'timestamp': time.time(), 'wavelength': sample[0], 'power': sample[1]}
+                time.sleep(max(poll_interval, period/2 if period else 0))
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stream_stats = {'samples': samples, 'polls': polls, 'elapsed': elapsed,
+                                  'rate': samples/elapsed if elapsed > 0 else 0.0}
+
+    def get_stream_stats(self):
+        """
+        Get statistics of the latest streaming.
+
+        :Returns: dict{"samples" => int, "polls" => int, "elapsed" => float, "rate" => float}, rate is the
+            achieved update rate in Hz.
+        """
+        return dict(self._stream_stats)
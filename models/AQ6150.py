@@ -1,6 +1,8 @@
 from ._VisaInstrument import VisaInstrument
 from ..instrument_types import TypeWM
+from ..instrument_types.WM import PEAK_DTYPE
 from ..constants import OpticalUnit
+import numpy as np
 
 
 class ModelAQ6150(VisaInstrument, TypeWM):
@@ -13,8 +15,16 @@ class ModelAQ6150(VisaInstrument, TypeWM):
         "Safe Power": "+18 dBm"
     }
 
+    # MEASuring bit of the SCPI operation status register, its negative transition marks the end of a cycle.
+    _measuring_bit = 4
+
     def __init__(self, resource_name, **kwargs):
         super(ModelAQ6150, self).__init__(resource_name, **kwargs)
+        self._measurement_event_ready = False
+
+    def _on_reopen(self):
+        # transition filter may be reset if the instrument was restarted.
+        self._measurement_event_ready = False
 
     # param encapsulation
 
@@ -78,6 +88,23 @@ class ModelAQ6150(VisaInstrument, TypeWM):
         msg_str = self.query(":FETC:ARR:POW?")
         return self.format_array_data(msg_str)
 
+    def get_peaks(self):
+        """
+        Get wavelength and power of all peaks. Both arrays are fetched in one message, so they come from the same
+        measurement cycle.
+        :return: (numpy.ndarray) structured array of PEAK_DTYPE, wavelength in nm, power in selected unit.
+        """
+        wl_str, pow_str = self.query(":FETC:ARR:POW:WAV?;:FETC:ARR:POW?").split(";")
+        wl_array = np.array(wl_str.split(","), dtype=float)
+        pow_array = np.array(pow_str.split(","), dtype=float)
+        num = int(wl_array[0])
+        if int(pow_array[0]) != num:
+            raise ValueError('Peak number mismatch between wavelength and power array')
+        peaks = np.empty(num, dtype=PEAK_DTYPE)
+        peaks['wavelength'] = wl_array[1:num+1]*10**9
+        peaks['power'] = pow_array[1:num+1]
+        return peaks
+
     def get_power_unit(self):
         """
         Get optical power unit.
@@ -125,4 +152,16 @@ class ModelAQ6150(VisaInstrument, TypeWM):
         """
         pow_str = self.query(":FETC:POW?")
         pow_float = float(pow_str)
-        return pow_float
\ No newline at end of file
+        return pow_float
+
+    def _fetch_sample(self):
+        wl_str, pow_str = self.query(":FETC:POW:WAV?;:FETC:POW?").split(";")
+        return round(float(wl_str)*10**9, 6), float(pow_str)
+
+    def _is_new_measurement(self):
+        mask = 1 << self._measuring_bit
+        if not self._measurement_event_ready:
+            # latch the end of each measurement cycle in the operation event register
+            self.command(':STAT:OPER:PTR 0;:STAT:OPER:NTR %d' % mask)
+            self._measurement_event_ready = True
+        return bool(int(self.query(':STAT:OPER:EVEN?')) & mask)
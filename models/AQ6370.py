@@ -1,6 +1,8 @@
 from ._VisaInstrument import VisaInstrument
 from ..instrument_types import TypeOSA
 import time
+import math
+import numpy as np
 from ..constants import LIGHT_SPEED
 
 
@@ -11,31 +13,43 @@ class ModelAQ6370(VisaInstrument, TypeOSA):
         "Wavelength Range": "600 ~ 1700 nm",
         "Max. Resolution": "0.02 nm"
     }
+    # analysis categories and settings are fixed by firmware, built once for all instances
+    _analysis_cat = ["WDM", "DFBLD", "FPLD", "SMSR"]
+    _analysis_setting_map = {
+        "WDM": ["TH", "MDIFF", "DMASK", "NALGO", "NAREA", "MAREA", "FALGO", "NBW"],
+        "DFBLD": {
+            "SWIDTH": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
+            "SMSR": ["SMODE", "SMASK", "MDIFF"],
+            "RMS": ["ALGO", "TH", "K", "MDIFF"],
+            "POWER": ["SPAN"],
+            "OSNR": ["MDIFF", "NALGO", "NAREA", "MAREA", "FALGO", "NBW", "SPOWER", "IRANGE"],
+        },
+        "FPLD": {
+            "SWIDTH": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
+            "MWAVE": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
+            "TPOWER": ["OFFSET"],
+            "MNUMBER": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
+        },
+        "SMSR": ["MASK", "MODE"]
+    }
+    _traces = frozenset(['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG'])
+    # in order of the numeric reply of :TRAC:ATTR?
+    _trace_attributes = ('WRIT', 'FIX', 'MAX', 'MIN', 'RAVG', 'CALC')
+    max_sample_points = 50001
 
-    def __init__(self, resource_name, username="anonymous", password="empty", **kwargs):
+    def __init__(self, resource_name, username="anonymous", password="empty", auto_tune=False, **kwargs):
         super(ModelAQ6370, self).__init__(resource_name, **kwargs)
-        self._analysis_cat = ["WDM", "DFBLD", "FPLD", "SMSR"]
-        self._analysis_setting_map = {
-            "WDM": ["TH", "MDIFF", "DMASK", "NALGO", "NAREA", "MAREA", "FALGO", "NBW"],
-            "DFBLD": {
-                "SWIDTH": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
-                "SMSR": ["SMODE", "SMASK", "MDIFF"],
-                "RMS": ["ALGO", "TH", "K", "MDIFF"],
-                "POWER": ["SPAN"],
-                "OSNR": ["MDIFF", "NALGO", "NAREA", "MAREA", "FALGO", "NBW", "SPOWER", "IRANGE"],
-            },
-            "FPLD": {
-                "SWIDTH": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
-                "MWAVE": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
-                "TPOWER": ["OFFSET"],
-                "MNUMBER": ["ALGO", "TH", "TH2", "K", "MFIT", "MDIFF"],
-            },
-            "SMSR": ["MASK", "MODE"]
-        }
         self._setup_map = ["BWIDTH:RES"]
+        # known trace state of instrument: {'active': str, 'TRA': {'attribute': str, 'display': bool}, ...}
+        self._trace_state = {}
+        self.__trace_manager = None
+        self.__lan_login = (username, password)
         # init LAN if connection method is TCPIP
         if self.resource_name.upper().startswith('TCPIP'):
             self.open_lan_port(username, password)
+        # auto tune needs to query the instrument, which is only possible after LAN login
+        if auto_tune:
+            self.auto_tune()
 
     # param encapsulation
     # Method
@@ -47,6 +61,10 @@ class ModelAQ6370(VisaInstrument, TypeOSA):
                 return
         raise PermissionError("Uncorrect LAN username or password for %s" % self.model)
 
+    def _on_reopen(self):
+        if self.resource_name.upper().startswith('TCPIP'):
+            self.open_lan_port(*self.__lan_login)
+
     def close(self):
         if self.resource_name.upper().startswith('TCPIP'):
             self.command('CLOSE')
@@ -422,27 +440,30 @@ class ModelAQ6370(VisaInstrument, TypeOSA):
         return self.command(':CALCULATE:MARKER:AOFF')
 
     def set_active_trace(self, trace_name):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
-        return self.command(':TRAC:ACT %s' % trace_name)
+        self.command(':TRAC:ACT %s' % trace_name)
+        self._trace_state['active'] = trace_name
 
     def set_trace_attribute(self, trace_name, attr):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
-        if attr not in ['WRIT', 'FIX', 'MAX', 'MIN', 'RAVG', 'CALC']:
+        if attr not in self._trace_attributes:
             raise ValueError('Invalid attr: %r' % attr)
-        return self.command(':TRAC:ATTR:%s %s' % (trace_name, attr))
+        self.command(':TRAC:ATTR:%s %s' % (trace_name, attr))
+        self._trace_state.setdefault(trace_name, {})['attribute'] = attr
 
     def set_trace_display(self, trace_name, state):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
         if not isinstance(state, bool):
             raise TypeError('Parameter state should be bool')
         state_str = 'ON' if state else 'OFF'
-        return self.command(':TRAC:STAT:%s %s' % (trace_name, state_str))
+        self.command(':TRAC:STAT:%s %s' % (trace_name, state_str))
+        self._trace_state.setdefault(trace_name, {})['display'] = state
 
     def clear_trace(self, trace_name):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
         return self.command(':TRAC:DEL %s' % trace_name)
 
@@ -450,19 +471,177 @@ class ModelAQ6370(VisaInstrument, TypeOSA):
         return self.command(':TRAC:DEL:ALL')
 
     def get_trace_data_x(self, trace_name):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
         result_str = self.query(':TRACE:X? %s' % trace_name)
         result_list = [float(i) for i in result_str.split(',')]
         return result_list
 
     def get_trace_data_y(self, trace_name):
-        if trace_name not in ['TRA', 'TRB', 'TRC', 'TRD', 'TRE', 'TRF', 'TRG']:
+        if trace_name not in self._traces:
             raise ValueError('Invalid trace_name: %r' % trace_name)
         result_str = self.query(':TRACE:Y? %s' % trace_name)
         result_list = [float(i) for i in result_str.split(',')]
         return result_list
 
+    def start_single_sweep(self):
+        """
+        Clear status and start a single sweep. Use wait_sweep to wait for completion.
+        """
+        return self.command('*CLS;:INIT:SMOD SINGLE;:INIT')
+
+    def is_sweep_complete(self):
+        """
+        If the single sweep started by start_single_sweep is completed.
+        :return: (bool) bit 0 of operation event register
+        """
+        return bool(int(self.query(':STAT:OPER:EVEN?')) & 1)
+
+    def wait_sweep(self, timeout=120, interval=0.05):
+        """
+        Wait for completion of single sweep.
+        :param timeout: (int|float) timeout in seconds
+        :param interval: (int|float) polling interval in seconds
+        """
+        start = time.perf_counter()
+        while not self.is_sweep_complete():
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError('Sweep of %s is not completed in %s seconds' % (self.model, timeout))
+            time.sleep(interval)
+
+    def plan_segments(self, start, stop, resolution, oversampling=5, overlap=None):
+        """
+        Plan wavelength segments for stitched sweep.
+        :param start: (float|int) start wavelength in nm
+        :param stop: (float|int) stop wavelength in nm
+        :param resolution: (float|int) resolution bandwidth in nm
+        :param oversampling: (int) sampling points per resolution bandwidth
+        :param overlap: (float|int|None) overlap between segments in nm, 10 x resolution if None
+        :return: (dict) {'segments': list of (start, stop), 'points': (int) sample points per segment}
+        """
+        for i in start, stop, resolution:
+            if not isinstance(i, (float, int)):
+                raise TypeError('Param start, stop and resolution should be number')
+        if not 0 < start < stop:
+            raise ValueError('Invalid start and stop value. Start and stop should be positive number, and start < stop')
+        if overlap is None:
+            overlap = 10*resolution
+        step = resolution/oversampling
+        max_span = step*(self.max_sample_points - 1)
+        if max_span <= overlap:
+            raise ValueError('overlap should be less than max span of a segment: %.3f nm' % max_span)
+        total = stop - start
+        num = max(1, math.ceil((total - overlap)/(max_span - overlap)))
+        seg_span = (total + (num - 1)*overlap)/num
+        points = min(self.max_sample_points, int(round(seg_span/step)) + 1)
+        segments = [(start + i*(seg_span - overlap), start + i*(seg_span - overlap) + seg_span) for i in range(num)]
+        return {'segments': segments, 'points': points}
+
+    @staticmethod
+    def _stitch(parts):
+        """
+        Merge segments sorted by wavelength, overlapping parts are cross-faded in linear power.
+        """
+        x, y = parts[0]
+        for nx, ny in parts[1:]:
+            lo, hi = nx[0], x[-1]
+            keep = x < lo
+            if hi > lo:
+                in_overlap = nx <= hi
+                ox = nx[in_overlap]
+                weight = (ox - lo)/(hi - lo)
+                prev = np.power(10.0, np.interp(ox, x, y)/10)
+                curr = np.power(10.0, ny[in_overlap]/10)
+                with np.errstate(divide='ignore'):
+                    oy = 10*np.log10((1 - weight)*prev + weight*curr)
+                x = np.concatenate((x[keep], ox, nx[~in_overlap]))
+                y = np.concatenate((y[keep], oy, ny[~in_overlap]))
+            else:
+                x = np.concatenate((x[keep], nx))
+                y = np.concatenate((y[keep], ny))
+        return x, y
+
+    def stitched_sweep(self, start, stop, resolution, oversampling=5, overlap=None, trace_name='TRA',
+                       buffer_trace='TRG', pipeline=True, compare=False, timeout=300):
+        """
+        High resolution sweep over a wide span, by sweeping segments and stitching the results.
+
+        If pipeline is True, the result of a segment is copied to buffer_trace, and transferred while the next
+        segment is sweeping. Set it False if the instrument does not respond to queries during sweep.
+
+        :param start: (float|int) start wavelength in nm
+        :param stop: (float|int) stop wavelength in nm
+        :param resolution: (float|int) resolution bandwidth in nm
+        :param oversampling: (int) sampling points per resolution bandwidth
+        :param overlap: (float|int|None) overlap between segments in nm, 10 x resolution if None
+        :param trace_name: (str) trace to sweep
+        :param buffer_trace: (str) fixed trace to hold the last segment during transfer
+        :param pipeline: (bool) if overlap sweep with data transfer
+        :param compare: (bool) if also time a single wide sweep with max sample points for comparison
+        :param timeout: (int|float) timeout in seconds of each sweep
+        :return: (dict) {'wavelength': (numpy.ndarray) in nm, 'level': (numpy.ndarray), 'segments': (int),
+                         'time': (float) in seconds, 'single_sweep_time': (float|None) in seconds}
+        """
+        if trace_name == buffer_trace:
+            raise ValueError('buffer_trace should be different from trace_name')
+        plan = self.plan_segments(start, stop, resolution, oversampling, overlap)
+        self.traces.set(trace_name, attribute='WRIT').set_active(trace_name)
+        if pipeline:
+            self.traces.set(buffer_trace, attribute='FIX')
+        self.traces.apply()
+        t0 = time.perf_counter()
+        self.command(':SENS:BAND:RES %.3fNM;:SENS:SWE:POIN %d' % (resolution, plan['points']))
+        parts = []
+        pending = None
+        for seg_start, seg_stop in plan['segments']:
+            self.command(':SENS:WAV:STAR %.4fNM;:SENS:WAV:STOP %.4fNM' % (seg_start, seg_stop))
+            self.start_single_sweep()
+            if pending is not None:
+                parts.append(self.traces.fetch([pending])[pending])
+            self.wait_sweep(timeout)
+            if pipeline:
+                self.command(':TRAC:COPY %s,%s' % (trace_name, buffer_trace))
+                pending = buffer_trace
+            else:
+                parts.append(self.traces.fetch([trace_name])[trace_name])
+        if pending is not None:
+            parts.append(self.traces.fetch([pending])[pending])
+        wavelength, level = self._stitch(parts)
+        elapsed = time.perf_counter() - t0
+        single_time = None
+        if compare:
+            t1 = time.perf_counter()
+            self.command(':SENS:SWE:POIN %d;:SENS:WAV:STAR %.4fNM;:SENS:WAV:STOP %.4fNM' % (
+                self.max_sample_points, start, stop))
+            self.start_single_sweep()
+            self.wait_sweep(timeout)
+            self.traces.fetch([trace_name])
+            single_time = time.perf_counter() - t1
+        return {'wavelength': wavelength, 'level': level, 'segments': len(parts), 'time': elapsed,
+                'single_sweep_time': single_time}
+
+    @property
+    def traces(self):
+        """
+        Trace manager which applies desired trace state with minimal batched commands.
+        """
+        if self.__trace_manager is None:
+            self.__trace_manager = AQ6370TraceManager(self)
+        return self.__trace_manager
+
+    def get_trace(self, trace_name):
+        """
+        Get X and Y data of a trace in one message, for host-side analysis (see pyinst.analysis).
+        :param trace_name: (str) trace name, TRA ~ TRG
+        :return: (tuple) (numpy.ndarray: wavelength in nm, numpy.ndarray: level)
+        """
+        if trace_name not in self._traces:
+            raise ValueError('Invalid trace_name: %r' % trace_name)
+        x_str, y_str = self.query(':TRACE:X? {t};:TRACE:Y? {t}'.format(t=trace_name)).split(';')
+        x = np.array(x_str.split(','), dtype=float)*10**9
+        y = np.array(y_str.split(','), dtype=float)
+        return x, y
+
     def save_screen(self, filepath):
         # create a unique name with nearly no chance to conflict
         temp_filename = 'tmp-{timestamp:X}'.format(timestamp=int(time.time()*10**6))
@@ -473,4 +652,156 @@ class ModelAQ6370(VisaInstrument, TypeOSA):
         with open(filepath, 'wb') as f:
             f.write(bytes(bin_data))
         # delete temp file from internal memory
-        self.command(':MMEMORY:DELETE "{filename}.BMP",internal'.format(filename=temp_filename))
\ No newline at end of file
+        self.command(':MMEMORY:DELETE "{filename}.BMP",internal'.format(filename=temp_filename))
+
+
+class AQ6370TraceManager(object):
+    """
+    Trace manager of AQ6370. Desired state of traces TRA ~ TRG is held locally, and only the difference from the
+    known instrument state is sent, in one message.
+
+    Example::
+
+        osa.traces.set('TRA', attribute='WRIT', display=True)
+        osa.traces.set('TRB', attribute='MAX', display=True)
+        osa.traces.set_active('TRA')
+        osa.traces.apply()
+        data = osa.traces.fetch(['TRA', 'TRB'])
+    """
+
+    def __init__(self, osa):
+        self._osa = osa
+        self._desired = {}
+        self._clear = []
+
+    def set(self, trace_name, attribute=None, display=None):
+        """
+        Set desired state of a trace, it is sent on apply.
+        :param trace_name: (str) TRA ~ TRG
+        :param attribute: (str|None) WRIT|FIX|MAX|MIN|RAVG|CALC, unchanged if None
+        :param display: (bool|None) if display the trace, unchanged if None
+        """
+        if trace_name not in self._osa._traces:
+            raise ValueError('Invalid trace_name: %r' % trace_name)
+        desired = self._desired.setdefault(trace_name, {})
+        if attribute is not None:
+            if attribute not in self._osa._trace_attributes:
+                raise ValueError('Invalid attr: %r' % attribute)
+            desired['attribute'] = attribute
+        if display is not None:
+            if not isinstance(display, bool):
+                raise TypeError('Parameter display should be bool')
+            desired['display'] = display
+        return self
+
+    def set_active(self, trace_name):
+        if trace_name not in self._osa._traces:
+            raise ValueError('Invalid trace_name: %r' % trace_name)
+        self._desired['active'] = trace_name
+        return self
+
+    def clear(self, *trace_names):
+        """
+        Clear data of traces on apply.
+        """
+        for trace_name in trace_names:
+            if trace_name not in self._osa._traces:
+                raise ValueError('Invalid trace_name: %r' % trace_name)
+            if trace_name not in self._clear:
+                self._clear.append(trace_name)
+        return self
+
+    def sync(self):
+        """
+        Read state of all traces from the instrument in one message.
+        """
+        names = sorted(self._osa._traces)
+        cmds = [':TRAC:ATTR:%s?' % t for t in names] + [':TRAC:STAT:%s?' % t for t in names] + [':TRAC:ACT?']
+        replies = [r.strip() for r in self._osa.query(';'.join(cmds)).split(';')]
+        state = self._osa._trace_state
+        for i, t in enumerate(names):
+            state[t] = {'attribute': self._osa._trace_attributes[int(replies[i])],
+                        'display': bool(int(replies[len(names) + i]))}
+        state['active'] = replies[-1]
+        return dict(state)
+
+    def get_changes(self):
+        """
+        Commands needed to reach the desired state from the known state.
+        :return: (list of str) commands
+        """
+        state = self._osa._trace_state
+        cmds = []
+        for t in sorted(k for k in self._desired if k != 'active'):
+            known = state.get(t, {})
+            for key, value in self._desired[t].items():
+                if known.get(key) == value:
+                    continue
+                if key == 'attribute':
+                    cmds.append(':TRAC:ATTR:%s %s' % (t, value))
+                else:
+                    cmds.append(':TRAC:STAT:%s %s' % (t, 'ON' if value else 'OFF'))
+        active = self._desired.get('active')
+        if active is not None and state.get('active') != active:
+            cmds.append(':TRAC:ACT %s' % active)
+        cmds.extend(':TRAC:DEL %s' % t for t in self._clear)
+        return cmds
+
+    def apply(self):
+        """
+        Send changes in one message.
+        :return: (int) number of commands sent
+        """
+        cmds = self.get_changes()
+        if cmds:
+            self._osa.command(';'.join(cmds))
+        state = self._osa._trace_state
+        for key, value in self._desired.items():
+            if key == 'active':
+                state['active'] = value
+            else:
+                state.setdefault(key, {}).update(value)
+        self._clear = []
+        return len(cmds)
+
+    def invalidate(self):
+        """
+        Forget the known instrument state, e.g. after operations on the front panel.
+        """
+        self._osa._trace_state.clear()
+
+    def fetch(self, trace_names, share_x=False):
+        """
+        Fetch data of traces in one message.
+        :param trace_names: (list of str) traces to fetch
+        :param share_x: (bool) if True, X data is fetched only once, for traces known to be from the same sweep.
+                        X of a trace whose number of points differs from the first trace is fetched separately.
+        :return: (dict) {trace_name: (numpy.ndarray: wavelength in nm, numpy.ndarray: level)}
+        """
+        trace_names = list(trace_names)
+        if not trace_names:
+            return {}
+        for trace_name in trace_names:
+            if trace_name not in self._osa._traces:
+                raise ValueError('Invalid trace_name: %r' % trace_name)
+        cmds = []
+        for i, t in enumerate(trace_names):
+            if i == 0 or not share_x:
+                cmds.append(':TRACE:X? %s' % t)
+            cmds.append(':TRACE:Y? %s' % t)
+        replies = self._osa.query(';'.join(cmds)).split(';')
+        result = {}
+        x = None
+        pos = 0
+        for i, t in enumerate(trace_names):
+            if i == 0 or not share_x:
+                x = np.array(replies[pos].split(','), dtype=float)*10**9
+                pos += 1
+            y = np.array(replies[pos].split(','), dtype=float)
+            pos += 1
+            if len(y) != len(x):
+                # not from the same sweep as the first trace
+                result[t] = (np.array(self._osa.query(':TRACE:X? %s' % t).split(','), dtype=float)*10**9, y)
+            else:
+                result[t] = (x, y)
+        return result
@@ -15,6 +15,8 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
         "PDL": "Less than 0.3 dB"
     }
     params = []
+    # tuning commands reply "done" after the filter is tuned.
+    settle_time = 0
 
     def __init__(self, resource_name, baudrate=115200, write_termination='\r\n', timeout=3, **kwargs):
         super(ModelBTF10011, self).__init__()
@@ -80,11 +82,13 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
         else:
             return float(re.search('.*WL\((.*?)\).*', data).group(1))
 
-    def set_wavelength(self, value):
+    def set_wavelength(self, value, wait=False):
         """
         Sets the filter center wavelength.
         :param value: (float|int) wavelength in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (int, float)):
             raise TypeError('wavelength value should be number')
         if not self._min_wl <= value <= self._max_wl:
@@ -100,6 +104,7 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
                 break
             if 'error' in dataline.lower():
                 raise ValueError('Get error when operating OTF.')
+        self._tuned(wait)
 
     def get_frequency(self):
         """
@@ -110,17 +115,18 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
         freq = round(LIGHT_SPEED/wl, 3)
         return freq
 
-    def set_frequency(self, value):
+    def set_frequency(self, value, wait=False):
         """
         Sets the filter center wavelength in frequency(THz).
         :param value: (float|int) optical frequency in THz
+        :param wait: (bool) if wait until the filter is settled
         """
         if not isinstance(value, (int, float)):
             raise TypeError('Frequency value should be number')
         if not self.min_frequency <= value <= self.max_frequency:
             raise ValueError('Frequency value out of range')
         wl = round(LIGHT_SPEED/value, 3)
-        return self.set_wavelength(wl)
+        return self.set_wavelength(wl, wait)
 
     def get_bandwidth(self):
         """
@@ -144,11 +150,13 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
         else:
             return float(re.search('.*LW\((.*?)nm\).*', data).group(1))
 
-    def set_bandwidth(self, value):
+    def set_bandwidth(self, value, wait=False):
         """
         Sets the filter bandwidth.
         :param value: (float|int) bandwidth setting value in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (float, int)):
             raise TypeError('Bandwidth value should be number')
         if not self.min_bandwidth <= value <= self.max_bandwidth:
@@ -165,3 +173,4 @@ class ModelBTF10011(BaseInstrument, TypeOTF):
                 break
             if 'error' in dataline.lower():
                 raise ValueError('Get error when operating OTF.')
+        self._tuned(wait)
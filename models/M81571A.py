@@ -5,6 +5,7 @@ import math
 
 class Model81571A(VisaInstrument, TypeVOA):
     model = "81571A"
+    idn_pattern = r'^816[34]'  # module of 8163/8164 mainframe
     brand = "Keysight"
     details = {
         "Wavelength Range": "1200~1700 nm",
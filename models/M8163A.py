@@ -6,6 +6,7 @@ import math
 class Model81635A(VisaInstrument, TypeOPM):
     brand = "Keysight"
     model = "81635A"
+    idn_pattern = r'^816[34]'  # module of 8163/8164 mainframe
     details = {
         "Wavelength Range": "800-1650 nm",
         "Power Range": "-80 to +10 dBm",
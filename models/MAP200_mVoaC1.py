@@ -3,10 +3,14 @@ from ._VisaInstrument import VisaInstrument
 from ..constants import LIGHT_SPEED, OpticalUnit
 from ..utils import dbm_to_w
 import math
+import numpy as np
+
+MAX_COMMANDS_PER_MESSAGE = 64  # max number of commands concatenated in one message of chassis controller.
 
 
 class ModelMAP200_mVoaC1(VisaInstrument, TypeVOA, TypeOPM):
     model = "MAP-200 mVoaC1"
+    idn_pattern = r'^MAP-?2\d{2}'
     details = {
         "Wavelength Range": "1260~1650 nm",
         "Att Range": "70 dB",
@@ -207,4 +211,125 @@ class ModelMAP200_mVoaC1(VisaInstrument, TypeVOA, TypeOPM):
         if not self.min_avg_time <= value <= self.max_avg_time:
             raise ValueError('Averaging time out of range')
         cmd = ':SENSe:POWer:ATIMe {device},{atime:.4f}'.format(device=self.__device, atime=value)
-        self.command(cmd)
\ No newline at end of file
+        self.command(cmd)
+
+
+class MAP200Chassis(VisaInstrument):
+    """
+    Controller of many mVoaC1 channels of MAP-200 chassis on one visa session. Commands of all channels are
+    concatenated, so an update of all channels takes as few messages as possible.
+
+    Example::
+
+        devices = [(0, slot, channel) for slot in range(1, 9) for channel in range(1, 5)]
+        voas = MAP200Chassis('TCPIP::192.168.1.10::8301::SOCKET', devices)
+        voas.set_att(np.linspace(0, 31, 32))
+        power = voas.get_power()
+    """
+    brand = "VIAVI"
+    model = "MAP-200 mVoaC1"
+
+    def __init__(self, resource_name, devices, **kwargs):
+        """
+        :param devices: (list) (chassis, slot, channel) of each channel, in order of arrays of methods
+        """
+        super(MAP200Chassis, self).__init__(resource_name, **kwargs)
+        devices = [tuple(d) for d in devices]
+        if not devices:
+            raise ValueError('devices should not be empty')
+        for d in devices:
+            if len(d) != 3 or not all(isinstance(i, int) for i in d):
+                raise TypeError('Each device should be (chassis, slot, channel) of int')
+        if len(set(devices)) != len(devices):
+            raise ValueError('Duplicate devices')
+        self.__devices = devices
+        self.__device_strs = ['{0:d},{1:d},{2:d}'.format(*d) for d in devices]
+        self._max_att = 70
+        # att last set of each channel, nan if unknown
+        self._att = np.full(len(devices), np.nan)
+
+    @property
+    def devices(self):
+        return list(self.__devices)
+
+    @property
+    def max_att(self):
+        return self._max_att
+
+    def __len__(self):
+        return len(self.__devices)
+
+    def _send(self, commands):
+        for i in range(0, len(commands), MAX_COMMANDS_PER_MESSAGE):
+            self.command(';'.join(commands[i:i + MAX_COMMANDS_PER_MESSAGE]))
+
+    def _query_all(self, header):
+        replies = []
+        for i in range(0, len(self.__device_strs), MAX_COMMANDS_PER_MESSAGE):
+            devices = self.__device_strs[i:i + MAX_COMMANDS_PER_MESSAGE]
+            reply = self.query(';'.join('{header} {device}'.format(header=header, device=d) for d in devices))
+            parts = [p.strip() for p in reply.split(';')]
+            if len(parts) != len(devices):
+                raise ValueError('Expect %d replies of %s, got %d' % (len(devices), header, len(parts)))
+            replies.extend(parts)
+        return replies
+
+    def set_att(self, values, force=False):
+        """
+        Set att of channels. Only channels whose att differs from the last setting are sent.
+
+        :Parameters:
+            - **values** - float|array like, att in dB of each channel, a scalar applies to all channels.
+            - **force** - bool, send all channels regardless of last setting.
+
+        :Returns: int, number of channels sent.
+        """
+        values = np.round(np.broadcast_to(np.asarray(values, dtype=float), (len(self),)), 4)
+        if not ((values >= 0) & (values <= self._max_att)).all():
+            raise ValueError('ATT value out of range.')
+        changed = np.flatnonzero(values != self._att) if not force else np.arange(len(self))
+        commands = [':OUTPut:ATTenuation {device},{att:.4f}'.format(device=self.__device_strs[i], att=values[i])
+                    for i in changed]
+        self._att[changed] = np.nan  # unknown until sent successfully
+        self._send(commands)
+        self._att[changed] = values[changed]
+        return changed.size
+
+    def get_att(self):
+        """
+        :Returns: numpy.ndarray, att setting in dB of each channel.
+        """
+        att = np.array(self._query_all(':OUTPut:ATTenuation?'), dtype=float)
+        self._att[:] = att
+        return att
+
+    def get_power(self):
+        """
+        Get output power of each channel. Under range is returned as -100 dBm, over range as nan.
+
+        :Returns: numpy.ndarray, power in dBm of each channel.
+        """
+        raw = np.array(self._query_all(':FETch:POWer:OUTPut?'))
+        under = np.char.startswith(raw, '-') & np.char.endswith(raw, '-')
+        over = np.char.startswith(raw, '+') & np.char.endswith(raw, '+')
+        power = np.full(raw.size, np.nan)
+        valid = ~(under | over)
+        power[valid] = raw[valid].astype(float)
+        power[under] = -100
+        return power
+
+    def enable(self, status=True):
+        """
+        Enable/disable output of channels.
+
+        :Parameters: **status** - bool|array like of bool, of each channel, a scalar applies to all channels.
+        """
+        status = np.broadcast_to(np.asarray(status, dtype=bool), (len(self),))
+        self._send([':OUTPut:BBLock {device},{state:d}'.format(device=d, state=not s)
+                    for d, s in zip(self.__device_strs, status)])
+
+    def is_enabled(self):
+        """
+        :Returns: numpy.ndarray of bool, if output of each channel is enabled.
+        """
+        return np.array(self._query_all(':OUTPut:BBLock?'), dtype=int) == 0
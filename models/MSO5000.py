@@ -1,20 +1,30 @@
 from ._VisaInstrument import VisaInstrument
 from ..instrument_types import TypeOSC
+import numpy as np
+
+WAVEFORM_CHUNK_POINTS = 1000000  # max number of points of each curve transfer.
 
 
 class ModelMSO5000(VisaInstrument, TypeOSC):
     model = ["MSO DPO 5000 Series"]
     brand = "Tektronix"
+    idn_pattern = r'^(MSO|DPO)5\d{3}'
+
+    # waveform preamble fields read for scaling, in order of reply.
+    _preamble_fields = ('XINcr', 'XZEro', 'PT_Off', 'YMUlt', 'YZEro', 'YOFf')
 
     def __init__(self, resource_name, **kwargs):
         # TODO: termination
         super(ModelMSO5000, self).__init__(resource_name, **kwargs)
+        # cached unit of each measurement slot: {slot: unit}, invalidated when type or source of slot is set.
+        self._measurement_units = {}
 
     def set_measurement_source(self, slot, source_idx, source):
         """
         source_idx: int, 1 or 2. most measurements has only 1 source.
         source: str, CH<x>|MATH<y>|REF<x>|HIStogram
         """
+        self._measurement_units.pop(slot, None)
         return self.command('MEASUrement:MEAS{slot:d}:SOUrce{idx:d} {source}'.format(slot=slot, idx=source_idx, source=source))
 
     def set_measurement_type(self, slot, m_type):
@@ -31,6 +41,7 @@ class ModelMSO5000(VisaInstrument, TypeOSC):
         RISe|RMS|RMSJitter|RMSNoise|SIGMA1|SIGMA2|
         SIGMA3|SIXSigmajit|SNRatio|STDdev|UNDEFINED| WAVEFORMS
         """
+        self._measurement_units.pop(slot, None)
         return self.command('MEASUrement:MEAS{slot}:TYPe {m_type}'.format(slot=slot, m_type=m_type))
         
     def start_measurement(self, slot, start=True):
@@ -50,4 +61,95 @@ class ModelMSO5000(VisaInstrument, TypeOSC):
             r = float(r)
         else:
             r = r.strip('"')
-        return r
\ No newline at end of file
+        return r
+
+    def reset_statistics(self):
+        """
+        Reset statistics of all measurements.
+        """
+        self.command('MEASUrement:STATIstics:COUNt RESET')
+
+    def get_measurements(self, slots, categories=('VALue',)):
+        """
+        Get several statistics of several slots in one message. Units are queried in the same message only for
+        slots whose unit is not cached.
+        slots: list of int
+        categories: list of str, VALue|MAXimum|MINImum|MEAN|STDdev|COUNt
+        return: dict, {'slot': numpy.ndarray of slots, 'unit': list of str, category: numpy.ndarray of values}
+        """
+        slots = list(slots)
+        categories = list(categories)
+        if 'UNIT' in (c.upper() for c in categories):
+            raise ValueError('Units are always returned, UNIT should not be in categories')
+        unknown = [slot for slot in dict.fromkeys(slots) if slot not in self._measurement_units]
+        cmd = ';'.join([':MEASUrement:MEAS{slot}:{category}?'.format(slot=slot, category=category)
+                        for slot in slots for category in categories] +
+                       [':MEASUrement:MEAS{slot}:UNIT?'.format(slot=slot) for slot in unknown])
+        replies = self.query(cmd).split(';')
+        n_values = len(slots)*len(categories)
+        if len(replies) != n_values + len(unknown):
+            raise ValueError('Expect %d replies of measurements, got %d' % (n_values + len(unknown), len(replies)))
+        for slot, unit in zip(unknown, replies[n_values:]):
+            self._measurement_units[slot] = unit.strip().strip('"')
+        values = np.array(replies[:n_values], dtype=float).reshape(len(slots), len(categories))
+        table = {'slot': np.array(slots), 'unit': [self._measurement_units[slot] for slot in slots]}
+        for i, category in enumerate(categories):
+            table[category] = values[:, i]
+        return table
+
+    def get_record_length(self):
+        """
+        return: int, number of points of acquisition record
+        """
+        return int(self.query('HORizontal:RECOrdlength?'))
+
+    def _get_preamble(self):
+        """
+        Query scaling fields of waveform preamble in one message.
+        return: dict, {field: float}
+        """
+        cmd = ';'.join(':WFMOutpre:{field}?'.format(field=f) for f in self._preamble_fields)
+        values = self.query(cmd).split(';')
+        return dict(zip(self._preamble_fields, map(float, values)))
+
+    def get_waveform(self, source, start=1, stop=None, width=2, chunk_points=WAVEFORM_CHUNK_POINTS):
+        """
+        Get waveform data of a source by binary curve transfer. Long records are transferred in chunks into a
+        pre-allocated array, and scaled to time and value by vectorized operations.
+        source: str, CH<x>|MATH<y>|REF<x>
+        start: int, first point of record, 1 based
+        stop: int|None, last point of record, the end of record if None
+        width: int, 1 or 2, bytes per point of transfer
+        chunk_points: int, max number of points of each transfer
+        return: tuple(numpy.ndarray time in s, numpy.ndarray value in vertical unit, usually V)
+        """
+        if width not in (1, 2):
+            raise ValueError('width should be 1 or 2')
+        if stop is None:
+            stop = self.get_record_length()
+        if not 1 <= start <= stop:
+            raise ValueError('Invalid waveform range: %r to %r' % (start, stop))
+        datatype = 'b' if width == 1 else 'h'
+        self.command('DATa:SOUrce {source};:DATa:ENCdg RIBinary;:DATa:WIDth {width:d}'.format(
+            source=source, width=width))
+        raw = np.empty(stop - start + 1, dtype=datatype)
+        preamble = None
+        for first in range(start, stop + 1, chunk_points):
+            last = min(first + chunk_points - 1, stop)
+            self.command('DATa:STARt {first:d};:DATa:STOP {last:d}'.format(first=first, last=last))
+            if preamble is None:
+                # preamble describes the first transferred point, it is queried after range is set
+                preamble = self._get_preamble()
+            data = self.query_binary('CURVe?', datatype, is_big_endian=True)
+            if data.size != last - first + 1:
+                raise ValueError('Expect %d points of waveform, got %d' % (last - first + 1, data.size))
+            raw[first - start:last - start + 1] = data
+        value = raw.astype(np.float64)
+        value -= preamble['YOFf']
+        value *= preamble['YMUlt']
+        value += preamble['YZEro']
+        t = np.arange(raw.size, dtype=np.float64)
+        t -= preamble['PT_Off']
+        t *= preamble['XINcr']
+        t += preamble['XZEro']
+        return t, value
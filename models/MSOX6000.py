@@ -6,37 +6,52 @@ from string import ascii_lowercase
 class ModelMSOX6000(VisaInstrument, TypeWGEN):
     model = ["MSO-X 6000 Series"]
     brand = "Keysight"
+    idn_pattern = r'^[MD]SO-?X ?6\d{3}'
+
+    _function_option_str = 'SINusoid | SQUare | RAMP | PULSe | NOISe | DC | SINC | '\
+                           'EXPRise | EXPFall | CARDiac | GAUSsian | ARBitrary'
+    # short forms of function options, such as 'SIN'.
+    _function_options = tuple(i.strip().strip(ascii_lowercase) for i in _function_option_str.split('|'))
+
+    _arbitrary_dac_range = (-512, 511)
+    _arbitrary_max_points = 8192
 
     def __init__(self, resource_name, wg_channel, **kwargs):
         super(ModelMSOX6000, self).__init__(resource_name, **kwargs)
         self.wg_channel = wg_channel
 
+    def _on_reopen(self):
+        # the instrument may have been restarted while the session was lost.
+        self.invalidate_wgen_state()
+
     def set_frequency(self, frequency):
-        return self.command(':WGEN{w:d}:FREQuency{frequency:.4e}'.format(
+        self.command(':WGEN{w:d}:FREQuency {frequency:.4e}'.format(
                                         w=self.wg_channel, frequency=frequency))
+        self._update_wgen_state(frequency=frequency)
 
     def get_frequency(self):
         return round(float(self.query(':WGEN{w:d}:FREQuency?'.format(w=self.wg_channel))), 4)
 
-    def set_function(self, signal:str):
-        option_str = 'SINusoid | SQUare | RAMP | PULSe | NOISe | DC | SINC | '\
-                     'EXPRise | EXPFall | CARDiac | GAUSsian | ARBitrary'
-        options = [i.strip().strip(ascii_lowercase) for i in option_str.strip().split('|')]
-        for i in options:
+    def _check_function(self, signal):
+        for i in self._function_options:
             if signal.upper().startswith(i):
                 break
         else:
-            raise ValueError('Invalid signal type. Options: %s' % option_str)
+            raise ValueError('Invalid signal type. Options: %s' % self._function_option_str)
 
-        return self.command(':WGEN{w:d}:FUNCtion {signal:s}'.format(
+    def set_function(self, signal:str):
+        self._check_function(signal)
+        self.command(':WGEN{w:d}:FUNCtion {signal:s}'.format(
                                         w=self.wg_channel, signal=signal))
+        self._update_wgen_state(function=signal)
 
     def get_function(self):
         return self.query(':WGEN{w:d}:FUNCtion?'.format(w=self.wg_channel))
 
     def enable(self, enable=True):
-        return self.command(':WGEN{w:d}:OUTPut {enable:d}'.format(
+        self.command(':WGEN{w:d}:OUTPut {enable:d}'.format(
                                             w=self.wg_channel, enable=enable))
+        self._update_wgen_state(output=bool(enable))
 
     def disable(self):
         return self.enable(enable=False)
@@ -45,37 +60,60 @@ class ModelMSOX6000(VisaInstrument, TypeWGEN):
         return bool(int(self.query(':WGEN{w:d}:OUTPut?'.format(w=self.wg_channel))))
     
     def set_period(self, period):
-        return self.command(':WGEN{w:d}:PERiod {period:.4e}'.format(
+        self.command(':WGEN{w:d}:PERiod {period:.4e}'.format(
                                         w=self.wg_channel, period=period))
+        self._wgen_state.pop('frequency', None)
 
     def get_period(self):
         return float(self.query(':WGEN{w:d}:PERiod?'.format(w=self.wg_channel)))
 
     def set_voltage_amplitude(self, amplitude):
-        return self.command(':WGEN{w:d}:VOLTage {amplitude:.4e}'.format(
+        self.command(':WGEN{w:d}:VOLTage {amplitude:.4e}'.format(
                                     w=self.wg_channel, amplitude=amplitude))
+        self._update_wgen_state(amplitude=amplitude)
 
     def get_voltage_amplitude(self):
         return float(self.query(':WGEN{w}:VOLTage?'.format(w=self.wg_channel)))
 
     def set_voltage_high(self, high):
-        return self.command(
+        self.command(
             ':WGEN{w:d}:VOLTage:HIGH {high:.4e}'.format(w=self.wg_channel, high=high))
+        self._update_wgen_state(high=high)
 
     def get_voltage_high(self):
-        return float(self.query(':WGEN{w:d}:VOLTage:HIGH?'.format(self.wg_channel)))
+        return float(self.query(':WGEN{w:d}:VOLTage:HIGH?'.format(w=self.wg_channel)))
 
     def set_voltage_low(self, low):
-        return self.command(
+        self.command(
             ':WGEN{w:d}:VOLTage:LOW {low:.4e}'.format(w=self.wg_channel, low=low))
+        self._update_wgen_state(low=low)
 
     def get_voltage_low(self):
         return float(self.query(':WGEN{w:d}:VOLTage:LOW?'.format(w=self.wg_channel)))
 
     def set_voltage_offset(self, offset):
-        return self.command(
+        self.command(
                 ':WGEN{w:d}:VOLTage:OFFSet {offset:.4e}'.format(
                                     w=self.wg_channel, offset=offset))
+        self._update_wgen_state(offset=offset)
 
     def get_voltage_offset(self):
-        return float(self.query(':WGEN{w:d}:VOLTage:OFFSet?'.format(w=self.wg_channel)))
\ No newline at end of file
+        return float(self.query(':WGEN{w:d}:VOLTage:OFFSet?'.format(w=self.wg_channel)))
+
+    def _apply_configure(self, params):
+        if 'function' in params:
+            self._check_function(params['function'])
+        templates = {
+            'function': ':WGEN{w:d}:FUNCtion {v:s}',
+            'frequency': ':WGEN{w:d}:FREQuency {v:.4e}',
+            'amplitude': ':WGEN{w:d}:VOLTage {v:.4e}',
+            'offset': ':WGEN{w:d}:VOLTage:OFFSet {v:.4e}',
+            'high': ':WGEN{w:d}:VOLTage:HIGH {v:.4e}',
+            'low': ':WGEN{w:d}:VOLTage:LOW {v:.4e}',
+            'output': ':WGEN{w:d}:OUTPut {v:d}',
+        }
+        self.command(';'.join(templates[name].format(w=self.wg_channel, v=value) for name, value in params.items()))
+
+    def _write_arbitrary(self, dac):
+        self.command(':WGEN{w:d}:ARBitrary:BYTeorder LSBFirst'.format(w=self.wg_channel))
+        self.write_binary(':WGEN{w:d}:ARBitrary:DATA:DAC '.format(w=self.wg_channel), dac, 'h', is_big_endian=False)
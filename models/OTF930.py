@@ -33,16 +33,19 @@ class ModelOTF930(VisaInstrument, TypeOTF):
         wl = float(wl_str)
         return wl
 
-    def set_wavelength(self, value):
+    def set_wavelength(self, value, wait=False):
         """
         Sets the filter center wavelength.
         :param value: (float|int) wavelength in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (int, float)):
             raise TypeError('Wavelength value should be number')
         if not self.min_wavelength <= value <= self.max_wavelength:
             raise ValueError('Wavelength value out of range')
-        return self.command('WA '+str(value))
+        self.command('WA '+str(value))
+        self._tuned(wait)
 
     def get_frequency(self):
         """
@@ -51,13 +54,14 @@ class ModelOTF930(VisaInstrument, TypeOTF):
         """
         return round(LIGHT_SPEED/self.get_wavelength(), 3)
 
-    def set_frequency(self, value):
+    def set_frequency(self, value, wait=False):
         """
         Sets the filter center wavelength in frequency(THz).
         :param value: (float|int) optical frequency in THz
+        :param wait: (bool) if wait until the filter is settled
         """
         wl_value = round(LIGHT_SPEED/value, 3)
-        return self.set_wavelength(wl_value)
+        return self.set_wavelength(wl_value, wait)
 
     def get_wavelength_offset(self):
         """
@@ -1,7 +1,6 @@
 from ._VisaInstrument import VisaInstrument
 from ..instrument_types import TypeOTF
 from ..constants import OpticalUnit
-from time import sleep
 
 
 class ModelOTF970(VisaInstrument, TypeOTF):
@@ -30,16 +29,31 @@ class ModelOTF970(VisaInstrument, TypeOTF):
 
     # Methods
     def _set_ranges(self):
-        self._min_wl = float(self.query(':WAV? MIN'))*10**9
-        self._max_wl = float(self.query(':WAV? MAX'))*10**9
-        self._min_freq = float(self.query(':FREQ? MIN'))/(10**12)
-        self._max_freq = float(self.query(':FREQ? MAX'))/(10**12)
-        self._min_bw = float(self.query(':BAND? MIN'))*10**9
-        self._max_bw = float(self.query(':BAND? MAX'))*10**9
-        self._min_wl_offs = float(self.query(':OFFS? MIN'))*10**9
-        self._max_wl_offs = float(self.query(':OFFS? MAX'))*10**9
-        self._min_bw_offs = float(self.query(':OFFS:Band? MIN'))*10**9
-        self._max_bw_offs = float(self.query(':OFFS:Band? MAX'))*10**9
+        ranges = self._get_capabilities(self._query_ranges)
+        self._min_wl = ranges['min_wl']
+        self._max_wl = ranges['max_wl']
+        self._min_freq = ranges['min_freq']
+        self._max_freq = ranges['max_freq']
+        self._min_bw = ranges['min_bw']
+        self._max_bw = ranges['max_bw']
+        self._min_wl_offs = ranges['min_wl_offs']
+        self._max_wl_offs = ranges['max_wl_offs']
+        self._min_bw_offs = ranges['min_bw_offs']
+        self._max_bw_offs = ranges['max_bw_offs']
+
+    def _query_ranges(self):
+        return {
+            'min_wl': float(self.query(':WAV? MIN'))*10**9,
+            'max_wl': float(self.query(':WAV? MAX'))*10**9,
+            'min_freq': float(self.query(':FREQ? MIN'))/(10**12),
+            'max_freq': float(self.query(':FREQ? MAX'))/(10**12),
+            'min_bw': float(self.query(':BAND? MIN'))*10**9,
+            'max_bw': float(self.query(':BAND? MAX'))*10**9,
+            'min_wl_offs': float(self.query(':OFFS? MIN'))*10**9,
+            'max_wl_offs': float(self.query(':OFFS? MAX'))*10**9,
+            'min_bw_offs': float(self.query(':OFFS:Band? MIN'))*10**9,
+            'max_bw_offs': float(self.query(':OFFS:Band? MAX'))*10**9,
+        }
 
     def get_wavelength(self):
         """
@@ -50,16 +64,19 @@ class ModelOTF970(VisaInstrument, TypeOTF):
         wl = float(wl_str)*10**9
         return wl
 
-    def set_wavelength(self, value):
+    def set_wavelength(self, value, wait=False):
         """
         Sets the filter center wavelength.
         :param value: (float|int) wavelength in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (float, int)):
             raise TypeError('Wavelength value should be number.')
         if not self.min_wavelength <= value <= self.max_wavelength:
             raise ValueError('Wavelength value out of range')
-        return self.command(':WAV '+str(value)+'nm')
+        self.command(':WAV '+str(value)+'nm')
+        self._tuned(wait)
 
     def get_wavelength_setting_state(self):
         """
@@ -79,16 +96,19 @@ class ModelOTF970(VisaInstrument, TypeOTF):
         freq = float(freq_str)/(10**12)
         return freq
 
-    def set_frequency(self, value):
+    def set_frequency(self, value, wait=False):
         """
         Sets the filter center wavelength in frequency(THz).
         :param value: (float|int) optical frequency in THz
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (float, int)):
             raise TypeError('Frequency value should be number.')
         if not self.min_frequency <= value <= self.max_frequency:
             raise ValueError('Frequency value out of range')
-        return self.command(':FREQ '+str(value)+'THz')
+        self.command(':FREQ '+str(value)+'THz')
+        self._tuned(wait)
 
     def get_wavelength_offset(self):
         """
@@ -119,16 +139,19 @@ class ModelOTF970(VisaInstrument, TypeOTF):
         bw = float(bw_str)*10**9
         return bw
 
-    def set_bandwidth(self, value):
+    def set_bandwidth(self, value, wait=False):
         """
         Sets the filter bandwidth.
         :param value: (float|int) bandwidth setting value in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (int, float)):
             raise TypeError('Bandwidth should be number')
         if not self.min_bandwidth <= value <= self.max_bandwidth:
             raise ValueError('Bandwidth value out of range')
-        return self.command(':BAND '+str(value)+'nm')
+        self.command(':BAND '+str(value)+'nm')
+        self._tuned(wait)
 
     def get_bandwidth_setting_state(self):
         """
@@ -139,6 +162,9 @@ class ModelOTF970(VisaInstrument, TypeOTF):
         state = bool(int(state_str))
         return state
 
+    def _is_tuning(self):
+        return self.get_wavelength_setting_state() or self.get_bandwidth_setting_state()
+
     def get_bandwidth_offset(self):
         """
         Reads out the offset bandwidth of filter bandwidth.
@@ -225,11 +251,10 @@ class ModelOTF970(VisaInstrument, TypeOTF):
         status = bool(int(status_str))
         return status
 
-    def peak_search(self, center, span):
+    def _start_peak_search(self, center, span):
         self._set_peak_search_center(center)
         self._set_peak_search_span(span)
         self._run_peak_search(True)
-        while True:
-            sleep(0.5)
-            if self._is_peak_search_complete():
-                return
\ No newline at end of file
+
+    def _cancel_peak_search(self):
+        self._run_peak_search(False)
@@ -16,6 +16,10 @@ class ModelPDLE101(VisaInstrument, TypePDLE):
         "PDL Accuracy": "2 ± (0.1 dB +1% of PDL)"
     }
 
+    _calibration_query = '*WAV?'
+    _keepalive_query = '*WAV?'
+    _has_idn = False
+
     def __init__(self, resource_name, write_termination='', read_termination='#', **kwargs):
         if resource_name.startswith('COM'):
             super(ModelPDLE101, self).__init__(
@@ -14,6 +14,10 @@ class ModelPMD1000(VisaInstrument, TypePMDE):
         "2nd Order PMD Range": "8100 ps2"
     }
 
+    _calibration_query = '*CHA?'
+    _keepalive_query = '*CHA?'
+    _has_idn = False
+
     def __init__(self, resource_name, write_termination='', read_termination='#', **kwargs):
         super(ModelPMD1000, self).__init__(
             resource_name, write_termination=write_termination, read_termination=read_termination, **kwargs
@@ -81,17 +81,21 @@ class ModelWaveShaper4000A(BaseInstrument, TypeOTF):
     def get_frequency(self):
         return self.__curr_freq
 
-    def set_wavelength(self, wl):
-        self.set_frequency(LIGHT_SPEED/wl)
+    def set_wavelength(self, wl, wait=False):
+        self.set_frequency(LIGHT_SPEED/wl, wait)
 
-    def set_frequency(self, freq):
+    def set_frequency(self, freq, wait=False):
+        self._check_wait(wait)
         bw = self.__curr_bw
         self.__upload_profile(freq, bw)
         self.__curr_freq = freq
+        self._tuned(wait)
 
     def get_bandwidth(self):
         return self.__curr_bw
 
-    def set_bandwidth(self, bw):
+    def set_bandwidth(self, bw, wait=False):
+        self._check_wait(wait)
         self.__upload_profile(self.__curr_freq, bw)
-        self.__curr_bw = bw
\ No newline at end of file
+        self.__curr_bw = bw
+        self._tuned(wait)
\ No newline at end of file
@@ -8,6 +8,10 @@ class ModelXTA50(VisaInstrument, TypeOTF):
     model = "XTA-50"
     brand = "EXFO"
 
+    _calibration_query = 'FREQ?'
+    _keepalive_query = 'FREQ?'
+    _has_idn = False
+
     def __init__(self, resource_name, read_termination='\r\n', write_termination='\r\n', **kwargs):
         RS232_CONFIG = {
             'baud_rate': 9600,
@@ -25,8 +29,15 @@ class ModelXTA50(VisaInstrument, TypeOTF):
         self._max_wl = 1620
         self._min_freq = round(LIGHT_SPEED/self._max_wl, 3)
         self._max_freq = round(LIGHT_SPEED/self._min_wl, 3)
-        self._min_bw = float(self.query('FWHM_MIN?').split('=')[1])
-        self._max_bw = float(self.query('FWHM_MAX?').split('=')[1])
+        ranges = self._get_capabilities(self._query_ranges)
+        self._min_bw = ranges['min_bw']
+        self._max_bw = ranges['max_bw']
+
+    def _query_ranges(self):
+        return {
+            'min_bw': float(self.query('FWHM_MIN?').split('=')[1]),
+            'max_bw': float(self.query('FWHM_MAX?').split('=')[1]),
+        }
 
     def get_wavelength(self):
         """
@@ -35,13 +46,14 @@ class ModelXTA50(VisaInstrument, TypeOTF):
         """
         return LIGHT_SPEED/self.get_frequency()
 
-    def set_wavelength(self, value):
+    def set_wavelength(self, value, wait=False):
         """
         Sets the filter center wavelength.
         :param value: (float|int) wavelength in nm
+        :param wait: (bool) if wait until the filter is settled
         """
         freq = LIGHT_SPEED/value
-        self.set_frequency(freq)
+        self.set_frequency(freq, wait)
 
     def get_frequency(self):
         """
@@ -51,16 +63,19 @@ class ModelXTA50(VisaInstrument, TypeOTF):
         freq = float(self.query('FREQ?').split('=')[1])
         return freq
 
-    def set_frequency(self, value):
+    def set_frequency(self, value, wait=False):
         """
         Sets the filter center wavelength in frequency(THz).
         :param value: (float|int) optical frequency in THz
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (float, int)):
             raise TypeError('Frequency value should be number.')
         if not self.min_frequency <= value <= self.max_frequency:
             raise ValueError('Frequency value out of range')
         self.query('FREQ={freq}'.format(freq=round(value, 5)))
+        self._tuned(wait)
 
     def get_bandwidth(self):
         """
@@ -70,13 +85,16 @@ class ModelXTA50(VisaInstrument, TypeOTF):
         bw = float(self.query('FWHM?').split('=')[1])
         return bw
 
-    def set_bandwidth(self, value):
+    def set_bandwidth(self, value, wait=False):
         """
         Sets the filter bandwidth.
         :param value: (float|int) bandwidth setting value in nm
+        :param wait: (bool) if wait until the filter is settled
         """
+        self._check_wait(wait)
         if not isinstance(value, (int, float)):
             raise TypeError('Bandwidth should be number')
         if not self.min_bandwidth <= value <= self.max_bandwidth:
             raise ValueError('Bandwidth value out of range')
         self.query('FWHM={bw}'.format(bw=round(value, 4)))
+        self._tuned(wait)
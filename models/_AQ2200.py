@@ -20,6 +20,7 @@ def checkAppType(*app_types):
         
 
 class ModelAQ2200(VisaInstrument):
+    idn_pattern = r'^AQ22\d{2}'  # modules of AQ2211/AQ2212 frame
     def __init__(self, resource_name, app_type, slot, channel=1, *args, **kwargs):
         # super
         super(ModelAQ2200, self).__init__(resource_name, read_termination='', *args, **kwargs)
@@ -9,6 +9,9 @@ class BaseInstrument(ABC):
     model = "No Model"
     details = {}
     params = []
+    # regex matched against the model field of *IDN? reply, for models whose IDN does not contain "model", such
+    # as a series name or a module in a mainframe. None if "model" is contained in the IDN.
+    idn_pattern = None
 
     def __init__(self, *args, **kwargs):
         super(BaseInstrument, self).__init__()
@@ -26,6 +29,15 @@ class BaseInstrument(ABC):
     def close(self):
         raise NotImplementedError('This instrument model lacks "close" method.')
 
+    def ping(self, timeout=None):
+        """
+        Cheap keepalive probe, models should rewrite it if check_connection is expensive.
+        """
+        return self.check_connection()
+
+    def reopen(self):
+        raise NotImplementedError('This instrument model lacks "reopen" method.')
+
     @abstractmethod
     def resource_name(self):
         """
@@ -217,3 +217,22 @@ class ModelN77xx(VisaInstrument):
             self.command(':sens' + str(self.slot) + ':corr ' + str(value) + 'DB')
         else:
             self.command("OUTP" + str(self.slot) + ":POW:OFFS " + str(value))
+
+    def _readback_and_set_att(self, opm, next_value):
+        """
+        Read current step and set next att in one message, if the value is read from this instrument.
+        """
+        same_instrument = opm is None or (isinstance(opm, ModelN77xx) and opm.resource_name == self.resource_name)
+        if next_value is None or not same_instrument:
+            return super(ModelN77xx, self)._readback_and_set_att(opm, next_value)
+        self.__check_is_voa()
+        if not 0 <= next_value <= self.max_att:
+            raise ValueError('Att value out of range')
+        if opm is None:
+            read_cmd = ":INP" + str(self.slot) + ":ATT?"
+        else:
+            read_cmd = ":FETC" + str(opm.slot) + ":POW?"
+        value_str = self.query(read_cmd + ";:INP" + str(self.slot) + ":ATT " + str(next_value) + "dB")
+        if not value_str:
+            raise ValueError('Empty return for sweep readback')
+        return float(value_str)
@@ -1,4 +1,5 @@
 from ._VisaInstrument import VisaInstrument
+import numpy as np
 
 
 class ModelVSA89600(VisaInstrument):
@@ -9,6 +10,9 @@ class ModelVSA89600(VisaInstrument):
     def __init__(self, resource_name, encoding='latin1', **kwargs):
         super(ModelVSA89600, self).__init__(resource_name, encoding=encoding, **kwargs)
         self.__resource_name = resource_name
+        # cached item names and units of each trace: {trace: {'names': list, 'units': list}}, with 'dtype' of
+        # trace record added by get_trace_record.
+        self._trace_schema = {}
 
     # param encapsulation
     @property
@@ -73,17 +77,88 @@ class ModelVSA89600(VisaInstrument):
         unit_list = list(map(lambda x: x.strip('"'), unit_list))
         return unit_list
 
-    def get_trace_data(self, trace):
+    def get_trace_schema(self, trace):
+        """
+        Get item names and units of the specified trace. They are queried in one message and cached until
+        invalidate_trace_schema is called, e.g. by smart_setup.
+        :param trace: (int) index of trace, 1 based from A. For example: A->1, E->5
+        :return: (dict) {'names': (list of str), 'units': (list of str)}
+        """
+        if trace not in self._trace_schema:
+            if not isinstance(trace, int):
+                raise TypeError('trace should be int')
+            if not trace >= 1:
+                raise ValueError('trace starts from 1')
+            name_str, unit_str = self.query(':TRACe{t:d}:DATA:TABLe:NAME?;:TRACe{t:d}:DATA:TABLe:UNIT?'.format(
+                t=trace)).split(';')
+            names = [i.strip('"') for i in name_str.split(',')]
+            units = [i.strip('"') for i in unit_str.split(',')]
+            self._trace_schema[trace] = {'names': names, 'units': units}
+        return self._trace_schema[trace]
+
+    def invalidate_trace_schema(self, trace=None):
+        """
+        Forget cached item names and units, after trace layout or measurement format is changed.
+        :param trace: (int|None) index of trace, all traces if None
+        """
+        if trace is None:
+            self._trace_schema.clear()
+        else:
+            self._trace_schema.pop(trace, None)
+
+    def _checked_values(self, trace, values):
+        """
+        Values should match the cached schema, otherwise the layout was changed without invalidation.
+        """
+        schema = self.get_trace_schema(trace)
+        if len(values) != len(schema['names']):
+            self.invalidate_trace_schema(trace)
+            schema = self.get_trace_schema(trace)
+            if len(values) != len(schema['names']):
+                raise ValueError('Number of values mismatch with item names of trace %d' % trace)
+        return schema
+
+    def get_trace_data(self, trace, out=None):
         """
         Get a formatted data include test item_names, values, and units.
+        Only values are queried, item names and units are cached, see get_trace_schema.
         :param trace: (int) index of trace, 1 based from A. For example: A->1, E->5
+        :param out: (dict|None) dict to update and return instead of creating a new one
         :return: (dict) { str:item1: (float:value, str:unit), ...}
         """
-        names = self.get_trace_item_names(trace)
         values = self.get_trace_values(trace)
-        units = self.get_trace_units(trace)
-        ilen = len(names)
-        res = {}
-        for i in range(ilen):
-            res[names[i]] = (values[i], units[i])
+        schema = self._checked_values(trace, values)
+        res = {} if out is None else out
+        res.update(zip(schema['names'], zip(values, schema['units'])))
         return res
+
+    def get_trace_record(self, trace):
+        """
+        Get values of the specified trace as a numpy record, with a field for each item. Item names should be
+        unique and not empty.
+        :param trace: (int) index of trace, 1 based from A. For example: A->1, E->5
+        :return: (numpy.ndarray) 0-d structured array, units are in get_trace_schema(trace)['units']
+        """
+        values = self.get_trace_values(trace)
+        schema = self._checked_values(trace, values)
+        if 'dtype' not in schema:
+            schema['dtype'] = np.dtype([(n, 'f8') for n in schema['names']])
+        return np.array(tuple(values), dtype=schema['dtype'])
+
+    def get_traces_values(self, traces):
+        """
+        Get values of several traces in one message.
+        :param traces: (list of int) indexes of traces, 1 based
+        :return: (dict) {trace: (numpy.ndarray) values}
+        """
+        traces = list(traces)
+        for trace in traces:
+            if not isinstance(trace, int):
+                raise TypeError('trace should be int')
+            if not trace >= 1:
+                raise ValueError('trace starts from 1')
+        if not traces:
+            return {}
+        cmd = ';'.join(':TRACe%d:DATA:TABLe?' % t for t in traces)
+        replies = self.query(cmd).split(';')
+        return {t: np.array(r.split(','), dtype=float) for t, r in zip(traces, replies)}
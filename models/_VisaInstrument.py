@@ -1,5 +1,8 @@
 import pyvisa
+import threading
+import numpy as np
 from ._BaseInstrument import BaseInstrument
+from ..cache import get_cache, set_cache, clear_cache
 
 # define const
 OPEN_TIMEOUT = 0  # default open timeout for all instruments if not specified during init.
@@ -7,6 +10,12 @@ TIMEOUT = 2000  # default timeout of operation in ms for all instruments if not
 QUERY_DELAY = 0.001  # the default time in seconds to wait after each write operation for all if not specified.
 READ_TERMINATION = '\n'  # default read termination for all instruments if not specified during init.
 WRITE_TERMINATION = '\n'  # default write termination for all instruments if not specified during init.
+# candidates of query delay in seconds tried by auto tuning, from the slowest to the fastest.
+QUERY_DELAY_CANDIDATES = (0.1, 0.05, 0.02, 0.01, 0.005, 0.002, 0.001, 0.0005, 0)
+# chunk size in bytes for read/write operations, depends on interface type.
+CHUNK_SIZES = {'ASRL': 4*1024, 'GPIB': 64*1024, 'USB': 256*1024, 'TCPIP': 1024*1024}
+PROFILE_CACHE = 'visa_profiles'  # name of the local cache file of communication profiles.
+CAPABILITY_CACHE = 'capabilities'  # name of the local cache file of queried capabilities (ranges etc.)
 
 # globals
 rm = pyvisa.ResourceManager()
@@ -15,17 +24,33 @@ rm = pyvisa.ResourceManager()
 class VisaInstrument(BaseInstrument):
     """
     Base class of visa instruments.
-    __init__(self, resource_name, read_termination=READ_TERMINATION, open_timeout=OPEN_TIMEOUT, **kwargs)
+    __init__(self, resource_name, read_termination=READ_TERMINATION, open_timeout=OPEN_TIMEOUT, auto_tune=False, use_cache=True, **kwargs)
     kwargs are directly passed to rm.open_resource
+    If auto_tune is True, query delay and chunk size are loaded from the local profile cache, or calibrated and
+    saved into the cache if this unit is opened for the first time.
+    If use_cache is True, capabilities queried from the unit (such as setting ranges) are loaded from local cache.
     """
+    # query used to calibrate communication timing, reply of it should not change during calibration.
+    _calibration_query = '*IDN?'
+    # query used as cheap keepalive probe if serial poll is not supported by the interface. It should not wait for
+    # pending operations (as *OPC? does), so that a busy instrument is not taken as lost.
+    _keepalive_query = '*STB?'
+    # False for models without *IDN? command, such units are identified by their resource name.
+    _has_idn = True
 
     def __init__(self, resource_name, read_termination=READ_TERMINATION, write_termination=WRITE_TERMINATION,
-                 timeout=TIMEOUT, open_timeout=OPEN_TIMEOUT, query_delay=QUERY_DELAY, **kwargs):
-        self.__inst = rm.open_resource(resource_name, read_termination=read_termination,
-                                       write_termination=write_termination, open_timeout=open_timeout,
-                                       timeout=timeout, query_delay=query_delay, **kwargs)
+                 timeout=TIMEOUT, open_timeout=OPEN_TIMEOUT, query_delay=QUERY_DELAY, auto_tune=False, use_cache=True, **kwargs):
+        self.__open_kwargs = dict(read_termination=read_termination, write_termination=write_termination,
+                                  open_timeout=open_timeout, timeout=timeout, query_delay=query_delay, **kwargs)
+        self.__inst = rm.open_resource(resource_name, **self.__open_kwargs)
         self.__resource_name = resource_name
+        # serializes I/O of this session between threads, such as a background health monitor.
+        self._io_lock = threading.RLock()
+        self.__profile_key = None
+        self.__use_cache = use_cache
         super(VisaInstrument, self).__init__()
+        if auto_tune:
+            self.auto_tune()
 
     @property
     def resource_name(self):
@@ -49,6 +74,36 @@ class VisaInstrument(BaseInstrument):
     def opc(self):
         return self.query('*OPC?')
 
+    @property
+    def query_delay(self):
+        """
+        Time in seconds to wait after each write operation of a query.
+        """
+        return self.__inst.query_delay
+
+    @query_delay.setter
+    def query_delay(self, value):
+        if not isinstance(value, (float, int)):
+            raise TypeError('query_delay should be number')
+        if value < 0:
+            raise ValueError('query_delay should >= 0')
+        self.__inst.query_delay = value
+
+    @property
+    def chunk_size(self):
+        """
+        Chunk size in bytes of read/write operations.
+        """
+        return self.__inst.chunk_size
+
+    @chunk_size.setter
+    def chunk_size(self, value):
+        if not isinstance(value, int):
+            raise TypeError('chunk_size should be int')
+        if value <= 0:
+            raise ValueError('chunk_size should > 0')
+        self.__inst.chunk_size = value
+
     def set_visa_attribute(self, *args, **kwargs):
         return self.__inst.set_visa_attribute(*args, **kwargs)
 
@@ -70,6 +125,164 @@ class VisaInstrument(BaseInstrument):
         except pyvisa.VisaIOError:
             return False
 
+    def _get_profile_key(self):
+        """
+        Key to identify this unit in local cache. It is the class name with the reply of *IDN?, which contains
+        serial number and firmware version, or with the resource name for models without *IDN? (_has_idn = False).
+        :return: (str) profile key
+        """
+        if self.__profile_key is None:
+            unit = self.idn.strip() if self._has_idn else self.resource_name
+            self.__profile_key = '%s|%s' % (self.__class__.__name__, unit)
+        return self.__profile_key
+
+    def calibrate_query_delay(self, candidates=QUERY_DELAY_CANDIDATES, repeat=3):
+        """
+        Measure the minimum safe query delay of this resource. Each candidate delay is tried from the slowest to
+        the fastest, until the reply of calibration query mismatches or times out. One step slower than the fastest
+        passed delay is applied as margin. If even the slowest candidate fails, the original delay is restored and
+        ValueError is raised.
+        :param candidates: (tuple of float) query delays in seconds to try
+        :param repeat: (int) times of query for each candidate
+        :return: (float) the applied query delay in seconds
+        """
+        candidates = sorted(candidates, reverse=True)
+        if not candidates:
+            raise ValueError('candidates should not be empty')
+        original = self.query_delay
+        self.query_delay = candidates[0]
+        try:
+            reference = self.query(self._calibration_query)
+        except pyvisa.VisaIOError:
+            self.query_delay = original
+            raise
+        passed = None
+        for i, delay in enumerate(candidates):
+            self.query_delay = delay
+            try:
+                ok = all(self.query(self._calibration_query) == reference for _ in range(repeat))
+            except pyvisa.VisaIOError:
+                ok = False
+            if not ok:
+                # discard late replies of the failed candidate
+                try:
+                    self.__inst.clear()
+                except pyvisa.VisaIOError:
+                    pass
+                break
+            passed = i
+        if passed is None:
+            self.query_delay = original
+            raise ValueError('Calibration query fails even with the slowest query delay: %r' % candidates[0])
+        safe_delay = candidates[max(passed - 1, 0)]
+        self.query_delay = safe_delay
+        return safe_delay
+
+    def calibrate_chunk_size(self):
+        """
+        Select the chunk size of read/write operations according to the interface type of this resource.
+        :return: (int) the applied chunk size in bytes
+        """
+        interface = self.resource_name.upper()
+        for prefix, size in CHUNK_SIZES.items():
+            if interface.startswith(prefix):
+                self.chunk_size = size
+                break
+        return self.chunk_size
+
+    def auto_tune(self, recalibrate=False):
+        """
+        Apply query delay and chunk size learned for this unit. If no profile is cached for this unit, or
+        recalibrate is True, the values are calibrated and saved into local profile cache.
+        :param recalibrate: (bool) if ignore cached profile
+        :return: (dict) {'query_delay': (float), 'chunk_size': (int)}
+        """
+        key = self._get_profile_key()
+        profile = None if recalibrate else get_cache(PROFILE_CACHE, key)
+        if profile:
+            self.query_delay = profile['query_delay']
+            self.chunk_size = profile['chunk_size']
+        else:
+            profile = {'query_delay': self.calibrate_query_delay(), 'chunk_size': self.calibrate_chunk_size()}
+            set_cache(PROFILE_CACHE, key, profile)
+        return profile
+
+    def clear_profile(self):
+        """
+        Remove the cached communication profile of this unit.
+        """
+        clear_cache(PROFILE_CACHE, self._get_profile_key())
+
+    def _get_capabilities(self, query_capabilities):
+        """
+        Get capabilities of this unit, such as setting ranges, from local cache. If they are not cached yet, or
+        cache is disabled, query_capabilities is called and its result is saved into the cache. Models without
+        *IDN? are always queried, since another unit may be connected to the same resource later.
+        :param query_capabilities: (callable) function without params, returns a JSON serializable dict
+        :return: (dict) capabilities
+        """
+        if not self.__use_cache or not self._has_idn:
+            return query_capabilities()
+        key = self._get_profile_key()
+        capabilities = get_cache(CAPABILITY_CACHE, key)
+        if capabilities is None:
+            capabilities = query_capabilities()
+            set_cache(CAPABILITY_CACHE, key, capabilities)
+        return capabilities
+
+    def invalidate_capabilities(self):
+        """
+        Remove the cached capabilities of this unit. They will be queried again on next open.
+        """
+        clear_cache(CAPABILITY_CACHE, self._get_profile_key())
+
+    def ping(self, timeout=None):
+        """
+        Cheap keepalive probe. Serial poll is used for GPIB resources, otherwise the keepalive query is sent.
+        :param timeout: (int|None) timeout in ms for this probe, the session timeout if None
+        :return: (bool) if instrument responded
+        """
+        with self._io_lock:
+            original = self.__inst.timeout
+            if timeout is not None:
+                self.__inst.timeout = timeout
+            try:
+                if self.resource_name.upper().startswith('GPIB') and self.resource_name.upper().endswith('INSTR'):
+                    self.__inst.read_stb()
+                    return True
+                return bool(self.__inst.query(self._keepalive_query))
+            except pyvisa.Error:
+                return False
+            finally:
+                if timeout is not None:
+                    self.__inst.timeout = original
+
+    def reopen(self):
+        """
+        Close the visa session and open it again with the same settings. Query delay, chunk size and timeout
+        currently applied are restored.
+        """
+        with self._io_lock:
+            settings = {}
+            for attr in ('query_delay', 'chunk_size', 'timeout'):
+                try:
+                    settings[attr] = getattr(self.__inst, attr)
+                except pyvisa.Error:
+                    pass
+            try:
+                self.__inst.close()
+            except pyvisa.Error:
+                pass
+            self.__inst = rm.open_resource(self.__resource_name, **self.__open_kwargs)
+            for attr, value in settings.items():
+                setattr(self.__inst, attr, value)
+            self._on_reopen()
+
+    def _on_reopen(self):
+        """
+        Called after the session is reopened, models which need initialization of session should rewrite it.
+        """
+
     def command(self, cmd):
         """
         Write a VISA command without read back.
@@ -77,7 +290,8 @@ class VisaInstrument(BaseInstrument):
         :param cmd: (str) VISA command
         :return: (BaseInstrument) self
         """
-        self.__inst.write(cmd)
+        with self._io_lock:
+            self.__inst.write(cmd)
 
     def read(self, bin=False):
         """
@@ -85,7 +299,8 @@ class VisaInstrument(BaseInstrument):
         Since it's always used after a 'command' method, it's better to use 'query' method instead of 2 separate 'command' and 'read'.
         :return: (str) message sent from instrument
         """
-        return self.__inst.read_binary_values('B') if bin else self.__inst.read()
+        with self._io_lock:
+            return self.__inst.read_binary_values('B') if bin else self.__inst.read()
 
     def query(self, cmd, bin=False):
         """
@@ -94,7 +309,30 @@ class VisaInstrument(BaseInstrument):
         :param bin: (bool) if true, get data in binary.
         :return: (str) message sent from instrument
         """
-        return self.__inst.query_binary_values(cmd, 'B') if bin else self.__inst.query(cmd)
+        with self._io_lock:
+            return self.__inst.query_binary_values(cmd, 'B') if bin else self.__inst.query(cmd)
+
+    def query_binary(self, cmd, datatype='B', is_big_endian=False):
+        """
+        Send a command and read back a IEEE 488.2 binary block, without conversion through python lists.
+        :param cmd: (str) VISA command
+        :param datatype: (str) format character of struct module, such as 'b', 'h', 'f'
+        :param is_big_endian: (bool) byte order of data
+        :return: (numpy.ndarray) 1-d array of data
+        """
+        with self._io_lock:
+            return self.__inst.query_binary_values(cmd, datatype, is_big_endian, container=np.ndarray)
+
+    def write_binary(self, cmd, values, datatype='B', is_big_endian=False):
+        """
+        Write a command followed by a IEEE 488.2 binary block of values.
+        :param cmd: (str) VISA command, header of the binary block
+        :param values: (numpy.ndarray|list) data to write
+        :param datatype: (str) format character of struct module, such as 'b', 'h', 'f'
+        :param is_big_endian: (bool) byte order of data
+        """
+        with self._io_lock:
+            self.__inst.write_binary_values(cmd, values, datatype, is_big_endian)
 
     def close(self):
         """
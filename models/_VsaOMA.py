@@ -4,10 +4,33 @@ from ..constants import LIGHT_SPEED
 
 
 class ModelVsaOMA(ModelVSA89600, TypeOMA):
+    idn_pattern = r'89600'  # IDN of VSA software
 
     def __init__(self, resource_name, **kwargs):
         super(ModelVsaOMA, self).__init__(resource_name, **kwargs)
 
+    def get_trace_items(self, trace):
+        return list(self.get_trace_schema(trace)['names'])
+
+    def _get_trace_schema(self, trace):
+        schema = self.get_trace_schema(trace)
+        return list(schema['names']), list(schema['units'])
+
+    def get_formatted_data(self, trace):
+        return self.get_trace_data(trace)
+
+    def _start_measurement(self):
+        self.command(':INIT:CONT OFF;*CLS;:INIT:IMM;*OPC')
+
+    def _is_measurement_complete(self):
+        return bool(int(self.query('*ESR?')) & 1)
+
+    def _resume_measurement(self):
+        self.command(':INIT:CONT ON')
+
+    def _fetch_traces_values(self, traces):
+        return self.get_traces_values(traces)
+
     def set_frequency(self, frequency):
         self.smart_setup(freq=frequency)
 
@@ -55,3 +78,5 @@ class ModelVsaOMA(ModelVSA89600, TypeOMA):
             self.command(':OMA:SMartSEtup:PREsetLAyout {enable:d}'.format(enable=pre_set_layout))
         if execute:
             self.command(':OMA:SMartSEtup:PERformProposedActions')
+            # proposed actions may change measurement format and trace layout
+            self.invalidate_trace_schema()
@@ -0,0 +1,264 @@
+"""
+Memory-mapped ring buffer recorder for long running monitor data.
+
+Each channel is a file of fixed size: a header followed by fixed-width records (timestamp, value). Records are
+written into the memory map in place, so data survives a crash of the writing process, and other processes can
+read live data without copying.
+"""
+import os
+import threading
+import time
+import numpy as np
+
+
+__all__ = ['RingBuffer', 'MonitorRecorder']
+
+MAGIC = b'PYINSTRB'
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('capacity', '<u8'), ('count', '<u8')])
+RECORD_DTYPE = np.dtype([('timestamp', '<f8'), ('value', '<f8')])
+
+
+class RingBuffer(object):
+    """
+    A fixed-size ring buffer of (timestamp, value) records in a memory-mapped file.
+
+    Only one process should open it with mode "w" or "a", any number of processes can open it with mode "r".
+    """
+
+    def __init__(self, path, capacity=None, mode='r'):
+        """
+        :param path: (str) file path
+        :param capacity: (int|None) number of records, required when creating a new file
+        :param mode: (str) "r" read only, "a" append to existing file or create, "w" create or truncate
+        """
+        if mode not in ('r', 'a', 'w'):
+            raise ValueError('Invalid mode: %r' % mode)
+        if mode == 'w' or (mode == 'a' and not os.path.exists(path)):
+            if not isinstance(capacity, int):
+                raise TypeError('capacity should be int')
+            if not capacity > 0:
+                raise ValueError('capacity should > 0')
+            with open(path, 'wb') as f:
+                f.truncate(HEADER_SIZE + capacity*RECORD_DTYPE.itemsize)
+            header = np.memmap(path, dtype=HEADER_DTYPE, mode='r+', shape=(1,))
+            header['magic'] = MAGIC
+            header['capacity'] = capacity
+            header['count'] = 0
+            header.flush()
+            del header
+        mm_mode = 'r' if mode == 'r' else 'r+'
+        self._header = np.memmap(path, dtype=HEADER_DTYPE, mode=mm_mode, shape=(1,))
+        if self._header['magic'][0] != MAGIC:
+            raise ValueError('Not a ring buffer file: %s' % path)
+        self._capacity = int(self._header['capacity'][0])
+        self._records = np.memmap(path, dtype=RECORD_DTYPE, mode=mm_mode, offset=HEADER_SIZE,
+                                  shape=(self._capacity,))
+        self._path = path
+        self._writable = mode != 'r'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return min(self.count, self._capacity)
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    @property
+    def count(self):
+        """
+        Total number of records written since creation, including overwritten ones.
+        """
+        return int(self._header['count'][0])
+
+    def append(self, value, timestamp=None):
+        """
+        Write a record. The record is written before the count is increased, so readers never see a partial record.
+        """
+        if not self._writable:
+            raise PermissionError('Ring buffer is opened read only: %s' % self._path)
+        count = self.count
+        self._records[count % self._capacity] = (time.time() if timestamp is None else timestamp, value)
+        self._header['count'] = count + 1
+
+    def flush(self):
+        if self._writable:
+            self._records.flush()
+            self._header.flush()
+
+    def latest(self, n=None):
+        """
+        The latest n records in time order. It is a zero-copy view of the file if the records do not wrap around
+        the end of buffer, otherwise a copy.
+
+        :param n: (int|None) number of records, all available records if None.
+        :return: (numpy.ndarray) structured array of fields "timestamp" and "value".
+        """
+        for _ in range(3):
+            count = self.count
+            available = min(count, self._capacity)
+            n = available if n is None else min(n, available)
+            start = (count - n) % self._capacity
+            if start + n <= self._capacity:
+                result = self._records[start:start + n]
+            else:
+                result = np.concatenate((self._records[start:], self._records[:start + n - self._capacity]))
+            # records may be overwritten by the writer during reading, if the buffer wrapped meanwhile
+            if self.count - count + n <= self._capacity:
+                return result
+        raise RuntimeError('Ring buffer is written faster than it can be read: %s' % self._path)
+
+    def since(self, timestamp):
+        """
+        Records with timestamp >= the given timestamp, in time order.
+        """
+        records = self.latest()
+        return records[np.searchsorted(records['timestamp'], timestamp):]
+
+    def downsample(self, bins, n=None):
+        """
+        Downsampled view of the latest n records for dashboards.
+
+        :param bins: (int) number of output points
+        :param n: (int|None) number of latest records, all available records if None.
+        :return: (dict) {'timestamp', 'mean', 'min', 'max'} of numpy.ndarray, one element per bin.
+        """
+        records = self.latest(n)
+        if records.size == 0:
+            empty = np.empty(0)
+            return {'timestamp': empty, 'mean': empty, 'min': empty, 'max': empty}
+        bins = max(1, min(bins, records.size))
+        size = records.size//bins
+        trimmed = records[records.size - size*bins:]
+        values = trimmed['value'].reshape(bins, size)
+        with np.errstate(invalid='ignore'):
+            return {'timestamp': trimmed['timestamp'].reshape(bins, size)[:, -1],
+                    'mean': np.nanmean(values, axis=1) if size > 1 else values[:, 0].copy(),
+                    'min': np.nanmin(values, axis=1),
+                    'max': np.nanmax(values, axis=1)}
+
+    def close(self):
+        self.flush()
+        self._records = None
+        self._header = None
+
+
+class MonitorRecorder(object):
+    """
+    Poll monitor functions at fixed interval in a background thread, and record each into a ring buffer file.
+
+    Example::
+
+        recorder = MonitorRecorder('monitor_data', capacity=72*3600)
+        recorder.add_channel('chamber_temp', ts.get_current_temp)
+        recorder.add_channel('opm1_dbm', opm.get_dbm_value)
+        recorder.start()
+
+    A failed reading is recorded as NaN. Another process can read live data with ``RingBuffer(path)``.
+    """
+
+    def __init__(self, directory, capacity, interval=1.0, flush_interval=10.0):
+        """
+        :param directory: (str) directory of ring buffer files, one file "<name>.ring" per channel
+        :param capacity: (int) number of records of each channel
+        :param interval: (int|float) polling interval in seconds
+        :param flush_interval: (int|float) interval in seconds between flushes to disk
+        """
+        if not interval > 0:
+            raise ValueError('interval should > 0')
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._capacity = capacity
+        self._interval = interval
+        self._flush_interval = flush_interval
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._errors = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def path(self, name):
+        return os.path.join(self._directory, '%s.ring' % name)
+
+    def add_channel(self, name, func, mode='a'):
+        """
+        :param name: (str) channel name
+        :param func: (callable) function without params, returns a number
+        :param mode: (str) "a" continue existing file, "w" start a new file
+        """
+        buffer = RingBuffer(self.path(name), self._capacity, mode=mode)
+        with self._lock:
+            self._channels[name] = (func, buffer)
+
+    def remove_channel(self, name):
+        with self._lock:
+            func, buffer = self._channels.pop(name)
+        # the polling thread may still hold the buffer in this round, so it is only flushed
+        buffer.flush()
+
+    def get_errors(self):
+        """
+        Last error of each channel whose latest reading failed.
+        """
+        with self._lock:
+            return dict(self._errors)
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='pyinst-monitor-recorder', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self._thread = None
+        with self._lock:
+            for func, buffer in self._channels.values():
+                buffer.flush()
+
+    def _run(self):
+        next_time = time.monotonic()
+        last_flush = next_time
+        while not self._stop_event.is_set():
+            with self._lock:
+                channels = list(self._channels.items())
+            for name, (func, buffer) in channels:
+                try:
+                    value = float(func())
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    value = float('nan')
+                    self._errors[name] = '%s: %s' % (type(e).__name__, e)
+                buffer.append(value)
+            now = time.monotonic()
+            if now - last_flush >= self._flush_interval:
+                for name, (func, buffer) in channels:
+                    buffer.flush()
+                last_flush = now
+            next_time += self._interval
+            if next_time < now:
+                next_time = now  # polling took longer than interval, do not try to catch up
+            self._stop_event.wait(next_time - now)
@@ -0,0 +1,226 @@
+import inspect
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from . import models
+
+
+__all__ = ['Station', 'load_station']
+
+PARAM_TYPES = {'int': int, 'float': (float, int), 'str': str, 'bool': bool}
+
+
+class Station(object):
+    """
+    A set of instruments described by a station configuration, opened concurrently.
+
+    The configuration maps alias to instrument description:
+
+    .. code-block:: json
+
+        {
+            "voa1": {"class_name": "ModelN7752A", "resource_name": "GPIB0::7::INSTR", "params": {"slot": 1}},
+            "osa": {"class_name": "ModelAQ6370", "resource_name": "TCPIP0::10.0.0.2::10001::SOCKET",
+                    "kwargs": {"password": "abc"}, "after": ["voa1"]}
+        }
+
+    params are validated against the ``params`` list of the model class. kwargs are passed to the model class
+    without validation. Instruments on the same resource (such as slots of a shared mainframe) are opened in
+    configuration order, and instruments listed in "after" are opened first.
+    """
+
+    def __init__(self, config):
+        if not isinstance(config, dict):
+            raise TypeError('Station config should be dict')
+        self._config = {}
+        for alias, desc in config.items():
+            self._config[alias] = self._validate(alias, desc)
+        self._levels = self._resolve_order()
+        self._instruments = {}
+        self._report = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __getitem__(self, alias):
+        return self._instruments[alias]
+
+    def __contains__(self, alias):
+        return alias in self._instruments
+
+    @property
+    def instruments(self):
+        """
+        Mapping of alias to opened instrument object.
+        """
+        return dict(self._instruments)
+
+    @property
+    def report(self):
+        """
+        Open report of each instrument.
+
+        :Return Type: dict{alias => {"time" => float|None, "error" => str|None}}
+        """
+        return dict(self._report)
+
+    @staticmethod
+    def _validate(alias, desc):
+        if not isinstance(desc, dict):
+            raise TypeError('Description of %r should be dict' % alias)
+        class_name = desc.get('class_name')
+        model_cls = getattr(models, class_name, None) if isinstance(class_name, str) else None
+        if not (inspect.isclass(model_cls) and class_name.startswith('Model')):
+            raise ValueError('Invalid class_name for %r: %r' % (alias, class_name))
+        resource_name = desc.get('resource_name')
+        if not isinstance(resource_name, str):
+            raise TypeError('resource_name of %r should be str' % alias)
+        params = desc.get('params', {})
+        kwargs = desc.get('kwargs', {})
+        after = desc.get('after', [])
+        if not isinstance(params, dict) or not isinstance(kwargs, dict):
+            raise TypeError('params and kwargs of %r should be dict' % alias)
+        if not isinstance(after, list):
+            raise TypeError('after of %r should be list' % alias)
+        for spec in model_cls.params:
+            name = spec['name']
+            if name not in params:
+                continue
+            value = params[name]
+            expected = PARAM_TYPES.get(spec.get('type'))
+            if expected and (not isinstance(value, expected) or
+                             (expected is int and isinstance(value, bool))):
+                raise TypeError('Param %r of %r should be %s' % (name, alias, spec['type']))
+            if 'options' in spec and value not in spec['options']:
+                raise ValueError('Invalid param %r of %r: %r. Options: %r' % (name, alias, value, spec['options']))
+            if 'min' in spec and value < spec['min']:
+                raise ValueError('Param %r of %r should >= %r' % (name, alias, spec['min']))
+            if 'max' in spec and value > spec['max']:
+                raise ValueError('Param %r of %r should <= %r' % (name, alias, spec['max']))
+        try:
+            inspect.signature(model_cls).bind(resource_name, **params, **kwargs)
+        except TypeError as e:
+            raise TypeError('Invalid params for %r (%s): %s' % (alias, class_name, e))
+        return {'class': model_cls, 'resource_name': resource_name, 'params': params, 'kwargs': kwargs,
+                'after': list(after)}
+
+    def _resolve_order(self):
+        """
+        Group aliases into levels. Instruments in the same level have no dependency on each other.
+        """
+        deps = {}
+        last_on_resource = {}
+        for alias, desc in self._config.items():
+            deps[alias] = set(desc['after'])
+            for dep in deps[alias]:
+                if dep not in self._config:
+                    raise ValueError('Unknown alias in "after" of %r: %r' % (alias, dep))
+            resource_key = desc['resource_name'].upper()
+            if resource_key in last_on_resource:
+                deps[alias].add(last_on_resource[resource_key])
+            last_on_resource[resource_key] = alias
+        levels = []
+        done = set()
+        while len(done) < len(deps):
+            level = [a for a in deps if a not in done and deps[a] <= done]
+            if not level:
+                raise ValueError('Circular dependency in station config: %r' % sorted(set(deps) - done))
+            levels.append(level)
+            done.update(level)
+        return levels
+
+    def _open_one(self, alias):
+        desc = self._config[alias]
+        start = time.perf_counter()
+        try:
+            inst = desc['class'](desc['resource_name'], **desc['params'], **desc['kwargs'])
+        except Exception as e:
+            return alias, None, {'time': time.perf_counter() - start, 'error': '%s: %s' % (type(e).__name__, e)}
+        return alias, inst, {'time': time.perf_counter() - start, 'error': None}
+
+    def open(self, max_workers=16, raise_error=True):
+        """
+        Open all instruments concurrently in dependency order.
+        Instruments listing a failed instrument in "after" are skipped.
+
+        :Parameters:
+            - **max_workers** - int, max number of instruments opened at the same time.
+            - **raise_error** - bool, if raise ConnectionError when any instrument fails to open.
+
+        :Returns: dict, open report, see ``report``.
+        """
+        failed = set()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for level in self._levels:
+                to_open = []
+                for alias in level:
+                    if alias in self._instruments:
+                        continue
+                    blocked = failed & set(self._config[alias]['after'])
+                    if blocked:
+                        failed.add(alias)
+                        self._report[alias] = {'time': None, 'error': 'Skipped, depends on %r' % sorted(blocked)}
+                    else:
+                        to_open.append(alias)
+                for alias, inst, report in executor.map(self._open_one, to_open):
+                    self._report[alias] = report
+                    if inst is None:
+                        failed.add(alias)
+                    else:
+                        self._instruments[alias] = inst
+        if failed and raise_error:
+            raise ConnectionError('Failed to open instruments: %s' % ', '.join(
+                '%s (%s)' % (a, self._report[a]['error']) for a in sorted(failed)))
+        return self.report
+
+    def close(self):
+        """
+        Close all opened instruments.
+        """
+        for alias in list(self._instruments):
+            inst = self._instruments.pop(alias)
+            try:
+                inst.close()
+            except Exception:
+                pass
+
+
+def load_station(path, open_instruments=True, **kwargs):
+    """
+    Load station configuration from a JSON or YAML (requires PyYAML) file.
+
+    :Parameters:
+        - **path** - str, path of configuration file, see ``Station`` for its format.
+        - **open_instruments** - bool, if open all instruments after loading.
+        - **kwargs** - passed to ``Station.open``.
+
+    If any instrument fails to open, the instruments already opened are closed before the error is raised. Use
+    the returned station as a context manager, so that instruments are also closed if the caller's code raises::
+
+        with load_station('station.json') as station:
+            station['osa'].get_trace('TRA')
+
+    :Return Type: Station
+    """
+    ext = os.path.splitext(path)[1].lower()
+    with open(path, 'r', encoding='utf-8') as f:
+        if ext in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise ModuleNotFoundError('PyYAML is required to load YAML station config: %s' % path)
+            config = yaml.safe_load(f)
+        else:
+            config = json.load(f)
+    station = Station(config)
+    if open_instruments:
+        try:
+            station.open(**kwargs)
+        except BaseException:
+            station.close()
+            raise
+    return station
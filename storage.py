@@ -0,0 +1,284 @@
+"""
+Compact columnar storage of measurement data.
+
+Two formats are supported:
+    - **h5** - one HDF5 file, each dataset is chunked and compressed. Requires h5py.
+    - **bin** - a directory, each dataset is a raw binary file with a JSON header, appended in place and read back
+      memory-mapped. No extra dependency, not compressed.
+
+Each dataset holds rows of fixed dtype and shape, with a timestamp column, and metadata of the instrument which
+produced it (brand, model, resource_name, settings).
+"""
+import json
+import os
+import time
+import numpy as np
+
+
+__all__ = ['MeasurementWriter', 'MeasurementReader']
+
+H5_CHUNK_ROWS = 256  # rows per chunk of HDF5 datasets.
+
+
+def _import_h5py():
+    try:
+        import h5py
+    except ImportError:
+        raise ModuleNotFoundError('h5py is required for HDF5 storage, or use fmt="bin".')
+    return h5py
+
+
+def _guess_format(path, fmt):
+    if fmt is None:
+        fmt = 'h5' if os.path.splitext(path)[1].lower() in ('.h5', '.hdf5') else 'bin'
+    if fmt not in ('h5', 'bin'):
+        raise ValueError('Invalid storage format: %r. Should be "h5" or "bin"' % fmt)
+    return fmt
+
+
+def _to_rows(data):
+    """
+    Convert a measurement into (rows, units). rows is an array whose first axis is row.
+    """
+    units = None
+    if isinstance(data, dict):
+        # such as {item: value} or {item: (value, unit)} from get_trace_data
+        names = list(data)
+        values = []
+        units = []
+        for name in names:
+            value = data[name]
+            if isinstance(value, (tuple, list)) and len(value) == 2 and isinstance(value[1], str):
+                values.append(value[0])
+                units.append(value[1])
+            else:
+                values.append(value)
+                units.append('')
+        dtype = np.dtype([(str(n), 'f8') for n in names])
+        rows = np.array([tuple(values)], dtype=dtype)
+    else:
+        array = np.asarray(data)
+        if array.dtype.names is not None and array.ndim == 1:
+            rows = array  # structured array, each element is a row
+        else:
+            if array.dtype.kind in 'OUS':
+                raise TypeError('Only numeric data can be stored, got dtype %s' % array.dtype)
+            rows = array[np.newaxis, ...]
+    return rows, units
+
+
+def _instrument_info(instrument, settings):
+    info = {}
+    if instrument is not None:
+        model = instrument.model
+        info['brand'] = instrument.brand
+        info['model'] = '/'.join(model) if isinstance(model, (tuple, list)) else model
+        info['resource_name'] = instrument.resource_name
+        info['class_name'] = instrument.__class__.__name__
+    if settings:
+        info['settings'] = settings
+    return info
+
+
+class MeasurementWriter(object):
+    """
+    Append-only writer of measurement data.
+
+    Example::
+
+        with MeasurementWriter('run.h5') as writer:
+            writer.append('wm_peaks', wm.get_peaks(), instrument=wm)
+            writer.append('osa_TRA', np.stack(osa.get_trace('TRA')), instrument=osa, settings={'res': 0.02})
+    """
+
+    def __init__(self, path, fmt=None, compression='gzip', flush_interval=1.0):
+        """
+        :param path: (str) file path for h5, directory path for bin.
+        :param fmt: (str|None) "h5"|"bin", guessed from file extension if None.
+        :param compression: (str|None) compression filter of HDF5 datasets.
+        :param flush_interval: (int|float) min interval in seconds between flushes to disk.
+        """
+        self._fmt = _guess_format(path, fmt)
+        self._path = path
+        self._compression = compression
+        self._flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+        self._datasets = {}
+        if self._fmt == 'h5':
+            self._file = _import_h5py().File(path, 'a')
+        else:
+            os.makedirs(path, exist_ok=True)
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def path(self):
+        return self._path
+
+    def append(self, name, data, instrument=None, settings=None, timestamp=None):
+        """
+        Append a measurement to dataset. The dataset is created on first append, later data must have the same
+        dtype and shape.
+
+        :param name: (str) dataset name
+        :param data: (numpy.ndarray|dict|list|float) measurement. A structured array appends one row per element,
+            a dict such as {item: (value, unit)} appends one row with a field per item, other data appends one row.
+        :param instrument: (BaseInstrument|None) instrument which produced the data, saved as metadata once.
+        :param settings: (dict|None) JSON serializable instrument settings, saved as metadata once.
+        :param timestamp: (float|None) timestamp of rows, now if None.
+        """
+        rows, units = _to_rows(data)
+        timestamps = np.full(rows.shape[0], time.time() if timestamp is None else timestamp, dtype='f8')
+        if name not in self._datasets:
+            info = _instrument_info(instrument, settings)
+            if units is not None:
+                info['units'] = dict(zip(rows.dtype.names, units))
+            self._create(name, rows, info)
+        self._append(name, rows, timestamps)
+        if time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def _create(self, name, rows, info):
+        if self._fmt == 'h5':
+            if name in self._file:
+                group = self._file[name]
+            else:
+                group = self._file.create_group(name)
+                group.create_dataset('data', shape=(0,) + rows.shape[1:], maxshape=(None,) + rows.shape[1:],
+                                     dtype=rows.dtype, chunks=(H5_CHUNK_ROWS,) + rows.shape[1:],
+                                     compression=self._compression)
+                group.create_dataset('timestamp', shape=(0,), maxshape=(None,), dtype='f8',
+                                     chunks=(H5_CHUNK_ROWS,), compression=self._compression)
+                group.attrs['info'] = json.dumps(info)
+            self._datasets[name] = group
+        else:
+            header_path = os.path.join(self._path, '%s.json' % name)
+            if os.path.exists(header_path):
+                with open(header_path, 'r', encoding='utf-8') as f:
+                    header = json.load(f)
+            else:
+                header = {'dtype': np.lib.format.dtype_to_descr(rows.dtype), 'shape': list(rows.shape[1:]),
+                          'info': info}
+                with open(header_path, 'w', encoding='utf-8') as f:
+                    json.dump(header, f, indent=2)
+            data_file = open(os.path.join(self._path, '%s.bin' % name), 'ab')
+            ts_file = open(os.path.join(self._path, '%s.ts.bin' % name), 'ab')
+            self._datasets[name] = (header, data_file, ts_file)
+
+    def _append(self, name, rows, timestamps):
+        if self._fmt == 'h5':
+            group = self._datasets[name]
+            data, ts = group['data'], group['timestamp']
+            if data.dtype != rows.dtype or data.shape[1:] != rows.shape[1:]:
+                raise ValueError('Data of %r should be dtype %s with row shape %s' % (name, data.dtype, data.shape[1:]))
+            n = data.shape[0]
+            data.resize(n + rows.shape[0], axis=0)
+            data[n:] = rows
+            ts.resize(n + rows.shape[0], axis=0)
+            ts[n:] = timestamps
+        else:
+            header, data_file, ts_file = self._datasets[name]
+            dtype = np.dtype(np.lib.format.descr_to_dtype(header['dtype']))
+            if rows.dtype != dtype or list(rows.shape[1:]) != header['shape']:
+                raise ValueError('Data of %r should be dtype %s with row shape %s' % (name, dtype, header['shape']))
+            data_file.write(np.ascontiguousarray(rows).tobytes())
+            ts_file.write(timestamps.tobytes())
+
+    def flush(self):
+        if self._fmt == 'h5':
+            self._file.flush()
+        else:
+            for header, data_file, ts_file in self._datasets.values():
+                data_file.flush()
+                ts_file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        if self._fmt == 'h5':
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        else:
+            for header, data_file, ts_file in self._datasets.values():
+                data_file.close()
+                ts_file.close()
+        self._datasets = {}
+
+
+class MeasurementReader(object):
+    """
+    Reader of data written by MeasurementWriter. Data is read lazily: memory-mapped arrays for bin format,
+    h5py datasets for h5 format, both support slicing without loading the whole dataset.
+    """
+
+    def __init__(self, path, fmt=None):
+        self._fmt = _guess_format(path, fmt)
+        self._path = path
+        if self._fmt == 'h5':
+            self._file = _import_h5py().File(path, 'r')
+        else:
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @property
+    def names(self):
+        """
+        Names of all datasets.
+        """
+        if self._fmt == 'h5':
+            return list(self._file.keys())
+        return sorted(f[:-5] for f in os.listdir(self._path) if f.endswith('.json'))
+
+    def info(self, name):
+        """
+        Metadata of dataset: brand, model, resource_name, class_name, settings, units.
+        """
+        if self._fmt == 'h5':
+            return json.loads(self._file[name].attrs['info'])
+        return self._header(name)['info']
+
+    def _header(self, name):
+        with open(os.path.join(self._path, '%s.json' % name), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _memmap(self, filename, dtype, shape):
+        path = os.path.join(self._path, filename)
+        row_size = dtype.itemsize*int(np.prod(shape))
+        rows = os.path.getsize(path)//row_size if row_size else 0
+        if rows == 0:
+            return np.empty((0,) + tuple(shape), dtype=dtype)
+        # a partially written last row, e.g. after a crash, is ignored
+        return np.memmap(path, dtype=dtype, mode='r', shape=(rows,) + tuple(shape))
+
+    def read(self, name):
+        """
+        Data of dataset, the first axis is row.
+        """
+        if self._fmt == 'h5':
+            return self._file[name]['data']
+        header = self._header(name)
+        dtype = np.dtype(np.lib.format.descr_to_dtype(header['dtype']))
+        return self._memmap('%s.bin' % name, dtype, header['shape'])
+
+    def timestamps(self, name):
+        """
+        Timestamps of rows of dataset.
+        """
+        if self._fmt == 'h5':
+            return self._file[name]['timestamp']
+        return self._memmap('%s.ts.bin' % name, np.dtype('f8'), [])
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,12 @@
+import importlib.util
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root is the "pyinst" package. Register it without running its __init__, so that modules which
+# do not need instrument drivers (and their dependencies like pyvisa) can be tested on their own.
+if 'pyinst' not in sys.modules:
+    spec = importlib.util.spec_from_file_location('pyinst', os.path.join(ROOT, '__init__.py'),
+                                                  submodule_search_locations=[ROOT])
+    sys.modules['pyinst'] = importlib.util.module_from_spec(spec)
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+from pyinst.analysis import find_peaks, smsr, spectral_width, osnr, channel_power, analyze_wdm, dwdm_grid
+
+RESOLUTION = 0.1
+NOISE_LEVEL = -60.0  # dBm in resolution bandwidth
+SIGNAL_LEVEL = -17.0  # dBm at channel center
+
+
+def _triangle(wavelength, center, peak, slope=100.0):
+    # linear in dB, so that interpolated crossings are exact
+    return peak - slope*np.abs(wavelength - center)
+
+
+def _wdm_trace(num=96, points=50000):
+    centers = dwdm_grid(191.3, 50, num)[::-1]
+    wavelength = np.linspace(centers[0] - 0.4, centers[-1] + 0.4, points)
+    linear = np.full(points, 10**(NOISE_LEVEL/10))
+    for c in centers:
+        linear += 10**(SIGNAL_LEVEL/10)*np.exp(-0.5*((wavelength - c)/0.02)**2)
+    return wavelength, 10*np.log10(linear), centers
+
+
+def test_find_peaks():
+    wl = np.linspace(1549, 1551, 2001)
+    level = np.maximum(_triangle(wl, 1549.5, -10), _triangle(wl, 1550.5, -25))
+    assert list(wl[find_peaks(wl, level, threshold=20)]) == pytest.approx([1549.5, 1550.5])
+    assert list(wl[find_peaks(wl, level, threshold=10)]) == pytest.approx([1549.5])
+
+
+def test_smsr():
+    wl = np.linspace(1549, 1551, 2001)
+    level = np.maximum(_triangle(wl, 1550.0, -10), _triangle(wl, 1550.6, -45))
+    ratio, side_wl = smsr(wl, level)
+    assert ratio == pytest.approx(35)
+    assert side_wl == pytest.approx(1550.6)
+
+
+def test_spectral_width_single_mode():
+    wl = np.linspace(1549, 1551, 2001)
+    width, center = spectral_width(wl, _triangle(wl, 1550.0, 0), threshold=3)
+    assert width == pytest.approx(0.06)
+    assert center == pytest.approx(1550.0)
+
+
+def test_spectral_width_covers_all_modes():
+    wl = np.linspace(1549, 1551, 2001)
+    # side mode 15 dB below the main one, with a dip below threshold between them
+    level = np.maximum(_triangle(wl, 1550.0, 0), _triangle(wl, 1550.5, -15))
+    width, center = spectral_width(wl, level, threshold=20, max_gap=0.5)
+    assert width == pytest.approx(0.75)
+    assert center == pytest.approx(1550.175)
+    width, center = spectral_width(wl, level, threshold=20)
+    assert width == pytest.approx(0.4)
+    assert center == pytest.approx(1550.0)
+
+
+def test_spectral_width_of_one_channel():
+    wl = np.linspace(1545, 1555, 10001)
+    level = np.maximum.reduce([_triangle(wl, c, 0) for c in (1546.0, 1550.0, 1554.0)])
+    peak_index = int(np.argmin(np.abs(wl - 1550.0)))
+    for max_gap in (0.0, 0.5):
+        width, center = spectral_width(wl, level, threshold=3, peak_index=peak_index, max_gap=max_gap)
+        assert width == pytest.approx(0.06)
+        assert center == pytest.approx(1550.0)
+
+
+def test_spectral_width_above_threshold_at_edge():
+    wl = np.linspace(1549, 1551, 2001)
+    with pytest.raises(ValueError):
+        spectral_width(wl, _triangle(wl, 1549.0, 0), threshold=3)
+
+
+def test_channel_power():
+    wl = np.linspace(1549, 1551, 2001)
+    level = np.full(wl.size, -20.5)
+    assert channel_power(wl, level, [1550.0], 1.0, RESOLUTION) == pytest.approx([-10.5])
+
+
+def test_osnr():
+    wl, level, centers = _wdm_trace()
+    result = osnr(wl, level, centers, 0.2, RESOLUTION)
+    assert result['osnr'] == pytest.approx(np.full(centers.size, 43.0), abs=0.01)
+    assert result['noise'] == pytest.approx(np.full(centers.size, NOISE_LEVEL), abs=0.01)
+
+
+def test_analyze_wdm():
+    wl, level, centers = _wdm_trace()
+    result = analyze_wdm(wl, level, centers, RESOLUTION)
+    assert result['osnr'] == pytest.approx(np.full(centers.size, 43.0), abs=0.01)
+    assert result['peak_wl'] == pytest.approx(centers, abs=1e-3)
+    assert result['peak_lvl'] == pytest.approx(np.full(centers.size, SIGNAL_LEVEL), abs=0.01)
@@ -0,0 +1,40 @@
+import inspect
+import pytest
+
+try:
+    from pyinst import models
+    from pyinst.functions import match_models
+except (ImportError, ValueError) as e:
+    # drivers of some models (VISA backend, win32com etc.) are not available on this platform
+    pytest.skip('models cannot be imported: %s' % e, allow_module_level=True)
+
+
+def _model_classes():
+    return [(name, cls) for name, cls in vars(models).items() if name.startswith('Model') and inspect.isclass(cls)]
+
+
+@pytest.mark.parametrize('class_name, model_cls', _model_classes())
+def test_every_model_can_be_matched(class_name, model_cls):
+    model_names = model_cls.model if isinstance(model_cls.model, (tuple, list)) else [model_cls.model]
+    for model_name in model_names:
+        idn = '%s,%s,SN0001,1.00' % (model_cls.brand, model_name)
+        assert class_name in [c['class_name'] for c in match_models(idn)]
+
+
+@pytest.mark.parametrize('idn, class_name', [
+    ('YOKOGAWA,AQ6370D,91K123456,02.08', 'ModelAQ6370'),
+    ('KEYSIGHT TECHNOLOGIES,MSO-X 6004A,MY12345678,07.10.2017', 'ModelMSOX6000'),
+    ('TEKTRONIX,MSO5204B,C012345,CF:91.1CT FV:10.8.3 Build 3', 'ModelMSO5000'),
+    ('VIAVI Solutions,MAP-200,M12345678,3.2.1', 'ModelMAP200_mVoaC1'),
+    ('Keysight Technologies,N7752A,MY00000001,V1.0', 'ModelN7752A'),
+    ('Agilent Technologies,8164B,DE12345678,V5.25', 'Model81635A'),
+    ('YOKOGAWA,AQ2211,91M123456,R2.01', 'ModelAQ2200_215'),
+])
+def test_match_real_idn(idn, class_name):
+    assert class_name in [c['class_name'] for c in match_models(idn)]
+
+
+def test_match_prefers_exact_model():
+    candidates = match_models('YOKOGAWA,AQ6151,91K123456,01.02')
+    assert candidates[0]['class_name'] == 'ModelAQ6150'
+    assert candidates[0]['model'] == 'AQ6151'